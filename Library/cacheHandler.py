@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.gradtagszahlen', 'cache')
+
+
+def iter_dates(start_date: str, end_date: str) -> Iterator[str]:
+    """
+    Iterate over all days of a period (both ends inclusive)
+
+    Args:
+        start_date: Start date in format 'YYYY-MM-DD'
+        end_date: End date in format 'YYYY-MM-DD'
+
+    Yields:
+        Date strings in format 'YYYY-MM-DD'
+    """
+    current = datetime.strptime(start_date, '%Y-%m-%d').date()
+    last = datetime.strptime(end_date, '%Y-%m-%d').date()
+    while current <= last:
+        yield current.isoformat()
+        current += timedelta(days=1)
+
+
+class TemperatureCache:
+    """
+    Persistent on-disk cache for daily archive series
+
+    Values are stored per location (rounded coordinates) and variable in
+    monthly JSON chunks, so overlapping periods only need the missing days
+    from the API. The least recently used chunks are evicted once the cache
+    grows beyond its size limit.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size_mb: float = 200.0,
+        precision: int = 4,
+        min_age_days: int = 7
+        ):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for the cache files (created if missing)
+            max_size_mb: Maximum cache size in megabytes before eviction
+            precision: Number of decimals coordinates are rounded to; the
+                archive downscales every point, so the default of 4 (about
+                10 m) keeps nearby sites apart
+            min_age_days: Days younger than this are never cached, because
+                the archive may still revise them
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.precision = precision
+        self.min_age_days = min_age_days
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = self._scan_size()
+
+    def lookup(
+        self,
+        latitude: float,
+        longitude: float,
+        variable: str,
+        start_date: str,
+        end_date: str
+        ) -> Tuple[Dict[str, float], List[Tuple[str, str]]]:
+        """
+        Look up a period in the cache
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            variable: Name of the daily API variable
+            start_date: Start date in format 'YYYY-MM-DD'
+            end_date: End date in format 'YYYY-MM-DD'
+
+        Returns:
+            Tuple of (cached values by date, missing (start, end) ranges)
+        """
+        location_dir = self._location_dir(latitude, longitude, variable)
+        cached = {}
+        missing = []
+        chunks = {}
+        run_start = run_end = None
+
+        with self._lock:
+            for day in iter_dates(start_date, end_date):
+                month = day[:7]
+                if month not in chunks:
+                    chunks[month] = self._read_chunk(location_dir, month)
+                value = chunks[month].get(day)
+                if value is not None:
+                    cached[day] = value
+                    if run_start is not None:
+                        missing.append((run_start, run_end))
+                        run_start = None
+                else:
+                    if run_start is None:
+                        run_start = day
+                    run_end = day
+
+        if run_start is not None:
+            missing.append((run_start, run_end))
+
+        self.logger.debug(
+            f"Cache lookup {location_dir}: {len(cached)} days cached, "
+            f"{len(missing)} missing ranges"
+        )
+        return cached, missing
+
+    def store(
+        self,
+        latitude: float,
+        longitude: float,
+        variable: str,
+        dates: List[str],
+        values: List[Optional[float]]
+        ) -> None:
+        """
+        Store daily values in the cache
+
+        Missing values and days younger than min_age_days are skipped.
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            variable: Name of the daily API variable
+            dates: Date strings in format 'YYYY-MM-DD'
+            values: Daily values matching the dates
+        """
+        cutoff = (date.today() - timedelta(days=self.min_age_days)).isoformat()
+        by_month = {}
+        for day, value in zip(dates, values):
+            if value is None or day > cutoff:
+                continue
+            by_month.setdefault(day[:7], {})[day] = value
+
+        if not by_month:
+            return
+
+        location_dir = self._location_dir(latitude, longitude, variable)
+        with self._lock:
+            os.makedirs(location_dir, exist_ok=True)
+            for month, month_values in by_month.items():
+                chunk = self._read_chunk(location_dir, month)
+                chunk.update(month_values)
+                self._write_chunk(location_dir, month, chunk)
+            if self._size > self.max_size_bytes:
+                self._evict()
+
+    def lookup_values(
+        self,
+        latitude: float,
+        longitude: float,
+        variable: str,
+        start_date: str,
+        end_date: str
+        ) -> Tuple[np.ndarray, List[Tuple[str, str]]]:
+        """
+        Look up a period as an array, like SeriesStore.lookup_values()
+
+        Returns:
+            Tuple of (float64 values of every day of the period with NaN
+            for days not cached, missing (start, end) ranges)
+        """
+        cached, missing = self.lookup(latitude, longitude, variable, start_date, end_date)
+        first = np.datetime64(start_date, 'D')
+        values = np.full(int((np.datetime64(end_date, 'D') - first).astype(np.int64)) + 1, np.nan)
+        if cached:
+            offsets = (np.array(list(cached), dtype='datetime64[D]') - first).astype(np.int64)
+            values[offsets] = list(cached.values())
+        return values, missing
+
+    def store_values(
+        self,
+        latitude: float,
+        longitude: float,
+        variable: str,
+        dates: np.ndarray,
+        values: np.ndarray
+        ) -> None:
+        """Store datetime64[D] dates and float values (NaN for missing ones), like SeriesStore.store_values()"""
+        valid = ~np.isnan(values)
+        self.store(
+            latitude, longitude, variable,
+            np.datetime_as_string(dates[valid]).tolist(), values[valid].tolist())
+
+    def clear(self) -> None:
+        """Remove all cached chunks"""
+        with self._lock:
+            for path, _, _ in self._iter_chunks():
+                os.remove(path)
+            self._size = 0
+
+    def _location_dir(self, latitude: float, longitude: float, variable: str) -> str:
+        """Directory holding the chunks of one location and variable"""
+        lat = f"{round(latitude, self.precision):.{self.precision}f}"
+        lon = f"{round(longitude, self.precision):.{self.precision}f}"
+        return os.path.join(self.cache_dir, variable, f"{lat}_{lon}")
+
+    def _read_chunk(self, location_dir: str, month: str) -> Dict[str, float]:
+        """Read a monthly chunk, marking it as recently used"""
+        path = os.path.join(location_dir, f"{month}.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                chunk = json.load(f)
+            os.utime(path)
+            return chunk
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            self.logger.warning(f"Ignoring unreadable cache chunk {path}: {e}")
+            return {}
+
+    def _write_chunk(self, location_dir: str, month: str, chunk: Dict[str, float]) -> None:
+        """Write a monthly chunk atomically and update the size bookkeeping"""
+        path = os.path.join(location_dir, f"{month}.json")
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(chunk, f, separators=(',', ':'), sort_keys=True)
+        os.replace(tmp_path, path)
+        self._size += os.path.getsize(path) - old_size
+
+    def _iter_chunks(self) -> Iterator[Tuple[str, int, float]]:
+        """Yield (path, size, last access) for every chunk file"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self) -> int:
+        """Total size of all chunk files in bytes"""
+        return sum(size for _, size, _ in self._iter_chunks())
+
+    def _evict(self) -> None:
+        """Remove least recently used chunks until the size limit is met"""
+        chunks = sorted(self._iter_chunks(), key=lambda chunk: chunk[2])
+        self._size = sum(size for _, size, _ in chunks)
+        target = int(self.max_size_bytes * 0.9)
+
+        for path, size, _ in chunks:
+            if self._size <= target:
+                break
+            os.remove(path)
+            self._size -= size
+            self.logger.debug(f"Evicted cache chunk {path}")
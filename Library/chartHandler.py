@@ -0,0 +1,301 @@
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+import plotly.graph_objects as go
+from PyQt5.QtCore import QUrl
+from PyQt5.QtWidgets import QComboBox, QVBoxLayout, QWidget
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+from Library.temperatureSeries import TemperatureSeries
+from Library.timingHandler import tracer
+
+# Directory for the locally cached plotly.js bundle
+PLOTLYJS_DIR = os.path.join(os.path.expanduser('~'), '.gradtagszahlen')
+
+# Series longer than this are downsampled for display
+MAX_CHART_POINTS = 1000
+
+# Page loaded once into the shared web view, figures are swapped in via showFigure()
+CHART_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset='utf-8'/>
+    <script src='{plotly_src}'></script>
+    <style> html, body {{ height:100%; margin:0; }} #chart {{ height:100vh; width:100vw; }} </style>
+</head>
+<body>
+    <div id='chart'></div>
+    <script>
+        function showFigure(figure) {{
+            Plotly.react('chart', figure.data, figure.layout, {{responsive: true}});
+        }}
+    </script>
+</body>
+</html>
+"""
+
+
+def local_plotlyjs_path(directory: str = PLOTLYJS_DIR) -> str:
+    """
+    Path of the plotly.js bundle shipped with the plotly package,
+    written to disk on first use so charts also work offline
+
+    Args:
+        directory: Directory the bundle is stored in
+
+    Returns:
+        Path of plotly-<version>.min.js
+    """
+    path = os.path.join(directory, f"plotly-{get_plotlyjs_version()}.min.js")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return path
+
+
+def downsample_lttb(values: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select representative points with Largest-Triangle-Three-Buckets
+
+    Keeps peaks and troughs of the series while reducing it to threshold
+    points; the first and last point are always kept.
+
+    Args:
+        values: Series values at equally spaced positions
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices of the selected points
+    """
+    length = len(values)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+
+    y = np.asarray(values, dtype=np.float64)
+    x = np.arange(length, dtype=np.float64)
+    bucket_size = (length - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = length - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        # Average of the next bucket as third triangle point
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def build_temperature_figure(
+    city_name: str,
+    series: TemperatureSeries,
+    room_temp: float,
+    heating_limit: float,
+    max_points: int = MAX_CHART_POINTS
+    ) -> go.Figure:
+    """
+    Build the temperature chart of a city
+
+    The heating demand is drawn as a single filled trace and long series
+    are downsampled to max_points, so the figure stays small for
+    multi-year periods.
+
+    Args:
+        city_name: City name for the title
+        series: Daily mean temperatures, gaps are shown as breaks
+        room_temp: Room temperature line
+        heating_limit: Heating limit line
+        max_points: Maximum number of plotted points
+
+    Returns:
+        Plotly figure
+    """
+    days = series.dates
+    values = series.values
+    if len(values) > max_points:
+        # Downsample the days with data, gaps are not visible at this scale anyway
+        valid = series.valid_mask
+        days = days[valid]
+        values = values[valid]
+        indices = downsample_lttb(values, max_points)
+        days = days[indices]
+        values = values[indices]
+    dates = np.datetime_as_string(days).tolist()
+    temperatures = [None if np.isnan(value) else value for value in values.tolist()]
+
+    fig = go.Figure()
+    # Temperaturkurve als Treppenfunktion (hv), keine Marker
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=temperatures,
+        name='Außentemperatur',
+        line=dict(color='#2196F3', shape='hv'),
+        hovertemplate='%{y:.1f}°C<extra></extra>',
+        mode='lines'
+    ))
+    # Raumtemperatur- und Heizgrenze-Linie, Anfangs- und Endpunkt genügen
+    period = [dates[0], dates[-1]] if dates else []
+    fig.add_trace(go.Scatter(
+        x=period,
+        y=[room_temp] * len(period),
+        name='Raumtemperatur',
+        line=dict(color='#FF9800', dash='dash'),
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=period,
+        y=[heating_limit] * len(period),
+        name='Heizgrenze',
+        line=dict(color='#F44336', dash='dash'),
+        hoverinfo='skip'
+    ))
+    # Heizbedarf: alle Blöcke von Heiztagen als Flächen einer einzigen Spur, getrennt durch None
+    x_fill, y_fill = [], []
+    block_start = None
+    for i, temp in enumerate(temperatures + [None]):  # +[None] für Blockende am Schluss
+        if temp is not None and temp < heating_limit:
+            if block_start is None:
+                block_start = i
+        elif block_start is not None:
+            x_fill += dates[block_start:i] + dates[block_start:i][::-1] + [None]
+            y_fill += [room_temp] * (i - block_start) + temperatures[block_start:i][::-1] + [None]
+            block_start = None
+    if x_fill:
+        fig.add_trace(go.Scatter(
+            x=x_fill,
+            y=y_fill,
+            fill='toself',
+            fillcolor='rgba(255, 152, 0, 0.2)',
+            line=dict(width=0),
+            name='Heizbedarf',
+            hoverinfo='skip',
+        ))
+    fig.update_layout(
+        title=f'Temperaturverlauf - {city_name}',
+        xaxis_title='Datum',
+        yaxis_title='Temperatur (°C)',
+        hovermode='x unified',
+        margin=dict(l=50, r=50, t=50, b=50),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01,
+            bgcolor='rgba(255, 255, 255, 0.8)'
+        )
+    )
+    return fig
+
+
+class ChartView(QWidget):
+    """
+    One shared web view showing the chart of the selected city
+
+    The page with plotly.js is loaded a single time; switching cities only
+    replaces the figure data, so no further browser renderers are created.
+    Figures can be added as builders, which run when the city is shown
+    first, so large runs do not build a figure per city on the GUI thread.
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        """
+        Initialize the chart view
+
+        Args:
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self._figures: Dict[str, Union[str, Callable[[], str]]] = {}
+        self._page_ready = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.selector = QComboBox()
+        self.selector.currentTextChanged.connect(self.show_chart)
+        layout.addWidget(self.selector)
+
+        self.web_view = QWebEngineView()
+        self.web_view.setMinimumHeight(400)
+        self.web_view.loadFinished.connect(self._on_load_finished)
+        layout.addWidget(self.web_view)
+
+        page_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
+        page_file.write(CHART_PAGE_TEMPLATE.format(plotly_src=self.plotly_src()))
+        page_file.close()
+        self._load_started = time.perf_counter()
+        self.web_view.load(QUrl.fromLocalFile(page_file.name))
+
+    def plotly_src(self) -> str:
+        """Script source of plotly.js for the chart page, the local bundle if possible"""
+        try:
+            return QUrl.fromLocalFile(local_plotlyjs_path()).toString()
+        except OSError:
+            return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+    def add_chart(self, name: str, figure_json: Union[str, Callable[[], str]]) -> None:
+        """
+        Add or replace the chart of a city
+
+        Args:
+            name: City name shown in the selector
+            figure_json: Plotly figure serialized with Figure.to_json(), or a
+                function returning it, called once the chart is first shown
+        """
+        self._figures[name] = figure_json
+        if self.selector.findText(name) < 0:
+            self.selector.addItem(name)
+        if self.selector.currentText() == name:
+            self.show_chart(name)
+
+    def show_chart(self, name: str) -> None:
+        """
+        Show the chart of a city
+
+        Args:
+            name: City name as passed to add_chart
+        """
+        if name not in self._figures:
+            return
+        if self.selector.currentText() != name:
+            # Triggers show_chart again through currentTextChanged
+            self.selector.setCurrentText(name)
+            return
+        if self._page_ready:
+            if callable(self._figures[name]):
+                self._figures[name] = self._figures[name]()
+            # The callback runs once the figure is drawn
+            started = time.perf_counter()
+            self.web_view.page().runJavaScript(
+                f"showFigure({self._figures[name]});",
+                lambda _: tracer.record('chart_load', started, time.perf_counter() - started, city=name))
+
+    def clear(self) -> None:
+        """Remove all charts"""
+        self._figures.clear()
+        self.selector.clear()
+        if self._page_ready:
+            self.web_view.page().runJavaScript("Plotly.purge('chart');")
+
+    def _on_load_finished(self, ok: bool) -> None:
+        """Show the selected chart once the page is ready"""
+        tracer.record('chart_page_load', self._load_started, time.perf_counter() - self._load_started)
+        self._page_ready = ok
+        if ok and self.selector.currentText():
+            self.show_chart(self.selector.currentText())
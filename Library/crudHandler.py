@@ -1,24 +1,168 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+import json
 import logging
+import threading
+import time
+
+from Library.timingHandler import tracer
+
+try:
+    import brotli  # noqa: F401 - enables brotli decoding in urllib3
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Fastest available JSON decoder, the standard library is the fallback
+try:
+    import orjson
+    JSON_DECODER = 'orjson'
+except ImportError:
+    try:
+        import msgspec
+        JSON_DECODER = 'msgspec'
+    except ImportError:
+        JSON_DECODER = 'json'
+
+
+def decode_json(content: bytes) -> Any:
+    """
+    Decode a JSON response body with the fastest available decoder
+
+    orjson and msgspec parse bytes directly without decoding them to str
+    first and are several times faster than the json module for the large
+    numeric arrays of multi-year responses.
+
+    Args:
+        content: Raw response body
+
+    Returns:
+        Decoded JSON document
+
+    Raises:
+        ValueError: For invalid JSON
+    """
+    if JSON_DECODER == 'orjson':
+        return orjson.loads(content)
+    if JSON_DECODER == 'msgspec':
+        try:
+            return msgspec.json.decode(content)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e))
+    return json.loads(content)
+
+
+# Status codes worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing out requests to a minimum interval"""
+    
+    def __init__(self, requests_per_second: float):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            requests_per_second: Maximum number of requests started per second
+        """
+        self.min_interval = 1.0 / requests_per_second
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self) -> None:
+        """Block until the next request slot is available"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Rate limiters are shared per host, so several handlers cannot exceed the limit together
+_host_rate_limiters: Dict[str, RateLimiter] = {}
+_host_rate_limiters_lock = threading.Lock()
+
+
+def get_host_rate_limiter(host: str, requests_per_second: float) -> RateLimiter:
+    """
+    Get the shared rate limiter of a host, creating it on first use
+    
+    Args:
+        host: Host name (network location) of the API
+        requests_per_second: Limit used when the limiter is created
+        
+    Returns:
+        RateLimiter instance for the host
+    """
+    with _host_rate_limiters_lock:
+        if host not in _host_rate_limiters:
+            _host_rate_limiters[host] = RateLimiter(requests_per_second)
+        return _host_rate_limiters[host]
+
 
 class CrudHandler:
     """Minimal CRUD Handler for API requests - starting with GET only"""
     
-    def __init__(self, base_url: str, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        requests_per_second: Optional[float] = None,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        compression: bool = True,
+        fast_json: bool = True
+        ):
         """
         Initialize the CRUD handler
         
         Args:
             base_url: Base URL for the API)
             timeout: Request timeout in seconds
+            requests_per_second: Optional request limit shared by all handlers of the same host
+            pool_size: Number of keep-alive connections kept open to the host
+            max_retries: Retries for connection errors, 429 and 5xx responses
+            backoff_factor: Base of the exponential backoff between retries in seconds,
+                a Retry-After header sent by the server takes precedence
+            compression: Negotiate gzip (and brotli, if installed) response compression
+            fast_json: Decode responses with orjson or msgspec if installed
         """
         self.base_url = base_url.rstrip('/')  # Remove trailing slash
         self.timeout = timeout
+        self.fast_json = fast_json
         self.headers = {
             'User-Agent': 'Gradtagszahlen-Tool',
             'Accept': 'application/json'
         }
+        if compression:
+            self.headers['Accept-Encoding'] = 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+        else:
+            self.headers['Accept-Encoding'] = 'identity'
+        
+        # Pooled session with keep-alive and retry policy
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self.rate_limiter = None
+        if requests_per_second:
+            self.rate_limiter = get_host_rate_limiter(
+                urlparse(self.base_url).netloc, requests_per_second)
         
         # Setup basic logging
         self.logger = logging.getLogger(__name__)
@@ -41,21 +185,27 @@ class CrudHandler:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         
         try:
+            if self.rate_limiter is not None:
+                with tracer.span('rate_limit_wait'):
+                    self.rate_limiter.wait()
+            
             self.logger.info(f"GET request to: {url}")
             
-            response = requests.get(
-                url=url,
-                params=params,
-                headers=self.headers,
-                timeout=self.timeout
-            )
+            # Includes retries and reading the body, decoding is timed separately
+            with tracer.span('http_request', endpoint=endpoint):
+                response = self.session.get(
+                    url=url,
+                    params=params,
+                    timeout=self.timeout
+                )
             
             # Raise exception for HTTP error status codes
             response.raise_for_status()
             
             # Try to parse JSON
             try:
-                data = response.json()
+                with tracer.span('json_decode', endpoint=endpoint):
+                    data = decode_json(response.content) if self.fast_json else response.json()
                 self.logger.info(f"Successful response: {response.status_code}")
                 return data
             except ValueError as e:
@@ -73,6 +223,16 @@ class CrudHandler:
         except Exception as e:
             self.logger.error(f"Unexpected error: {e}")
             raise
+    
+    def close(self) -> None:
+        """Close the pooled connections"""
+        self.session.close()
+    
+    def __enter__(self) -> 'CrudHandler':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
 
 # Example usage for Open-Meteo
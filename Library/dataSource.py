@@ -0,0 +1,320 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from Library.crudHandler import CrudHandler
+from Library.requestCoalescer import Cell
+from Library.timingHandler import tracer
+
+# Daily variable requested from the archive API
+TEMPERATURE_VARIABLE = 'temperature_2m_mean'
+
+# Daily series as returned by all sources: datetime64[D] dates and float64 values, NaN for gaps
+DailySeries = Tuple[np.ndarray, np.ndarray]
+
+
+def period_days(start_date: str, end_date: str) -> np.ndarray:
+    """datetime64[D] array of all days of a period, both ends inclusive"""
+    return np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+
+
+class TemperatureSource(ABC):
+    """
+    Interface of the daily mean temperature sources used by the calculator
+
+    A source answers requests for several grid cells and one period at a
+    time. Sources reading local files are not cached, they are as fast as
+    the cache itself.
+    """
+
+    # Whether fetched series should be stored in the TemperatureCache
+    cacheable = False
+
+    # Variable name the series are cached under; it has to change with
+    # every option that changes the values, like the aggregation time zone
+    cache_variable = TEMPERATURE_VARIABLE
+
+    @abstractmethod
+    def fetch(self, cells: List[Cell], start_date: str, end_date: str) -> List[DailySeries]:
+        """
+        Daily mean temperatures of several cells
+
+        Args:
+            cells: Distinct (latitude, longitude) cells
+            start_date: Start date in format 'YYYY-MM-DD'
+            end_date: End date in format 'YYYY-MM-DD'
+
+        Returns:
+            List of (datetime64[D] dates, float64 values with NaN for gaps) per cell
+
+        Raises:
+            ValueError: For invalid responses or data
+        """
+
+
+class OpenMeteoSource(TemperatureSource):
+    """Open-Meteo historical weather API"""
+
+    cacheable = True
+
+    def __init__(self, crud_handler: CrudHandler, timezone: str = 'auto'):
+        """
+        Initialize the source
+
+        Args:
+            crud_handler: CrudHandler for the archive API
+            timezone: Time zone of the daily aggregation; 'auto' makes the API
+                look up the local zone of every location, 'GMT' skips the lookup
+                when days in UTC are acceptable
+        """
+        self.crud_handler = crud_handler
+        self.timezone = timezone
+        # Days aggregated in different zones must not mix in one cache; '/' would nest directories
+        self.cache_variable = f"{TEMPERATURE_VARIABLE}@{timezone.replace('/', '-')}"
+
+    def fetch(self, cells: List[Cell], start_date: str, end_date: str) -> List[DailySeries]:
+        """
+        Request daily series from the archive API, using comma-separated
+        coordinate lists for several cells
+
+        Only the one daily variable is requested, with unix timestamps
+        instead of ISO date strings, which are smaller to transfer and are
+        converted to dates without parsing strings.
+        """
+        params = {
+            'latitude': ','.join(str(latitude) for latitude, _ in cells),
+            'longitude': ','.join(str(longitude) for _, longitude in cells),
+            'start_date': start_date,
+            'end_date': end_date,
+            'daily': TEMPERATURE_VARIABLE,
+            'timezone': self.timezone,
+            'timeformat': 'unixtime'}
+
+        response = self.crud_handler.get('archive', params)
+
+        with tracer.span('validation'):
+            # A single location is answered with an object, several with a list
+            locations = response if isinstance(response, list) else [response]
+            if len(locations) != len(cells):
+                raise ValueError(
+                    f"API returned {len(locations)} locations for {len(cells)} requested")
+
+            # Extract temperature data into typed arrays
+            series = []
+            for cell, location in zip(cells, locations):
+                daily = location.get('daily', {})
+                if 'time' not in daily or TEMPERATURE_VARIABLE not in daily:
+                    raise ValueError(f"Invalid API response for cell {cell}")
+                times = np.asarray(daily['time'])
+                if times.dtype.kind in 'iu':
+                    # Unix timestamps of local midnight; rounding to the nearest day
+                    # absorbs daylight saving shifts against the reported UTC offset
+                    offset = int(location.get('utc_offset_seconds', 0))
+                    dates = ((times + offset + 43200) // 86400).astype('datetime64[D]')
+                else:
+                    dates = times.astype('datetime64[D]')
+                values = np.asarray(daily[TEMPERATURE_VARIABLE], dtype=np.float64)
+                if len(dates) != len(values):
+                    raise ValueError(f"Invalid API response for cell {cell}")
+                series.append((dates, values))
+        return series
+
+
+class ParquetSource(TemperatureSource):
+    """
+    Station or grid point archive in a Parquet file
+
+    Expects the long format with one row per point and day and the columns
+    latitude, longitude, date and temperature (°C). Only the distinct
+    points are held in memory; every request reads just the rows of its
+    nearest points and period, filtered by pyarrow.dataset. Files sorted by
+    point and date read fastest, because row groups outside the filter are
+    skipped by their statistics. Requires pyarrow.
+    """
+
+    def __init__(self, path: str, max_distance: float = 0.5):
+        """
+        Open the file and index its points
+
+        Args:
+            path: Path of the Parquet file (or directory of files)
+            max_distance: Maximum distance in degrees to the nearest point,
+                cells farther away get no data
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            import pyarrow.dataset as ds
+        except ImportError:
+            raise ImportError("Parquet sources require pyarrow (pip install pyarrow)")
+        self.path = path
+        self.max_distance = max_distance
+        self.logger = logging.getLogger(__name__)
+        self._pa = pa
+        self._pc = pc
+        self._ds = ds
+
+        self._dataset = ds.dataset(path, format='parquet')
+        self._date_type = self._dataset.schema.field('date').type
+        # Distinct points batch by batch, the coordinate columns are never loaded as a whole
+        points = set()
+        for batch in self._dataset.to_batches(columns=['latitude', 'longitude']):
+            pairs = np.column_stack([batch.column(0).to_numpy(), batch.column(1).to_numpy()])
+            points.update(map(tuple, np.unique(pairs, axis=0).tolist()))
+        self.points = np.array(sorted(points), dtype=np.float64).reshape(-1, 2)
+        self.logger.info(f"Indexed {len(self.points)} points in {path}")
+
+    def nearest_point(self, latitude: float, longitude: float) -> Optional[int]:
+        """Index of the nearest point within max_distance, None if there is none"""
+        if not len(self.points):
+            return None
+        # Longitude differences shrink towards the poles
+        scale = np.cos(np.radians(latitude))
+        distances = np.hypot(self.points[:, 0] - latitude, (self.points[:, 1] - longitude) * scale)
+        nearest = int(np.argmin(distances))
+        return nearest if distances[nearest] <= self.max_distance else None
+
+    def fetch(self, cells: List[Cell], start_date: str, end_date: str) -> List[DailySeries]:
+        days = period_days(start_date, end_date)
+        nearest = [self.nearest_point(latitude, longitude) for latitude, longitude in cells]
+        wanted = sorted({point for point in nearest if point is not None})
+        columns = {}
+        if wanted:
+            field = self._ds.field
+            first, last = self._pa.array(days[[0, -1]]).cast(self._date_type)
+            # isin() per coordinate may match more points than wanted, they are dropped below
+            condition = (
+                field('latitude').isin(self._pa.array(np.unique(self.points[wanted, 0])))
+                & field('longitude').isin(self._pa.array(np.unique(self.points[wanted, 1])))
+                & (field('date') >= first) & (field('date') <= last))
+            table = self._dataset.to_table(
+                columns=['latitude', 'longitude', 'date', 'temperature'], filter=condition)
+            latitudes = table.column('latitude').to_numpy()
+            longitudes = table.column('longitude').to_numpy()
+            dates = self._pc.cast(table.column('date'), self._pa.date32()).to_numpy().astype('datetime64[D]')
+            values = table.column('temperature').to_numpy(zero_copy_only=False).astype(np.float64)
+            for point in wanted:
+                rows = (latitudes == self.points[point, 0]) & (longitudes == self.points[point, 1])
+                columns[point] = (dates[rows], values[rows])
+
+        series = []
+        for point in nearest:
+            series_values = np.full(len(days), np.nan)
+            if point is not None:
+                point_dates, point_values = columns[point]
+                series_values[(point_dates - days[0]).astype(np.int64)] = point_values
+            series.append((days, series_values))
+        return series
+
+
+class XarraySource(TemperatureSource):
+    """
+    Gridded archive in a NetCDF file or Zarr store, e.g. an ERA5 download
+
+    Read lazily through xarray, only the requested points and days are
+    loaded. Values in Kelvin are converted to °C, sub-daily data is
+    averaged to daily means. Requires xarray and a backend (netCDF4 or
+    h5netcdf for NetCDF, zarr for Zarr).
+    """
+
+    LATITUDE_NAMES = ('latitude', 'lat')
+    LONGITUDE_NAMES = ('longitude', 'lon')
+    TIME_NAMES = ('time', 'valid_time', 'date')
+
+    def __init__(self, path: str, variable: Optional[str] = None, max_distance: float = 0.5):
+        """
+        Open the dataset
+
+        Args:
+            path: Path of a .nc file or a .zarr store
+            variable: Temperature variable, defaults to the only (or first) data variable
+            max_distance: Maximum distance in degrees to the nearest grid point
+
+        Raises:
+            ValueError: If coordinates or the variable cannot be found
+        """
+        try:
+            import xarray
+        except ImportError:
+            raise ImportError("NetCDF/Zarr sources require xarray (pip install xarray netCDF4 zarr)")
+        self.path = path
+        self.max_distance = max_distance
+        self.logger = logging.getLogger(__name__)
+        self._xarray = xarray
+
+        if path.rstrip('/').endswith('.zarr'):
+            dataset = xarray.open_zarr(path)
+        else:
+            dataset = xarray.open_dataset(path)
+        self.latitude_name = self._find_name(dataset, self.LATITUDE_NAMES)
+        self.longitude_name = self._find_name(dataset, self.LONGITUDE_NAMES)
+        self.time_name = self._find_name(dataset, self.TIME_NAMES)
+        variable = variable or next(iter(dataset.data_vars), None)
+        if variable not in dataset.data_vars:
+            raise ValueError(f"Variable {variable} not found in {path}")
+        self.data = dataset[variable]
+        self.kelvin = self.data.attrs.get('units', '').strip() in ('K', 'kelvin', 'Kelvin')
+
+    @staticmethod
+    def _find_name(dataset, candidates: Tuple[str, ...]) -> str:
+        name = next((name for name in candidates if name in dataset.coords), None)
+        if name is None:
+            raise ValueError(f"None of the coordinates {candidates} found")
+        return name
+
+    def fetch(self, cells: List[Cell], start_date: str, end_date: str) -> List[DailySeries]:
+        days = period_days(start_date, end_date)
+        latitudes = np.array([latitude for latitude, _ in cells])
+        longitudes = np.array([longitude for _, longitude in cells])
+
+        # One vectorized selection of all cells and the period
+        points = self.data.sel(
+            {self.latitude_name: self._xarray.DataArray(latitudes, dims='cell'),
+             self.longitude_name: self._xarray.DataArray(longitudes, dims='cell')},
+            method='nearest')
+        points = points.sel({self.time_name: slice(str(days[0]), f"{days[-1]}T23:59:59")})
+        times = points[self.time_name].values.astype('datetime64[D]')
+        if len(np.unique(times)) < len(times):
+            # Hourly data, e.g. ERA5 single levels
+            points = points.resample({self.time_name: '1D'}).mean()
+            times = points[self.time_name].values.astype('datetime64[D]')
+        values = points.transpose('cell', ...).values.astype(np.float64)
+        if self.kelvin:
+            values = values - 273.15
+
+        found_latitudes = np.asarray(points[self.latitude_name].values, dtype=np.float64)
+        found_longitudes = np.asarray(points[self.longitude_name].values, dtype=np.float64)
+        offsets = (times - days[0]).astype(np.int64)
+        series = []
+        for index, (latitude, longitude) in enumerate(cells):
+            full = np.full(len(days), np.nan)
+            distance = max(abs(found_latitudes[index] - latitude), abs(found_longitudes[index] - longitude))
+            if distance <= self.max_distance:
+                full[offsets] = values[index]
+            series.append((days, full))
+        return series
+
+
+def create_source(path: str, **kwargs) -> TemperatureSource:
+    """
+    Create the local source matching a path
+
+    Args:
+        path: .parquet file or directory, .nc file or .zarr store
+        kwargs: Passed to the source
+
+    Returns:
+        TemperatureSource instance
+
+    Raises:
+        ValueError: For unsupported paths
+    """
+    extension = os.path.splitext(path.rstrip('/'))[1].lower()
+    if extension in ('.nc', '.nc4', '.netcdf', '.zarr'):
+        return XarraySource(path, **kwargs)
+    if extension == '.parquet' or os.path.isdir(path):
+        return ParquetSource(path, **kwargs)
+    raise ValueError(f"Unsupported data source: {path}")
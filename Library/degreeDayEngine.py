@@ -0,0 +1,120 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+# Selectable metrics; the VDI 2067 Gradtagszahl is always calculated
+METRICS = ('gradtagszahl', 'heating_degree_days', 'cooling_degree_days', 'monthly')
+
+# Base temperature of the cooling degree days in °C
+DEFAULT_COOLING_BASE = 18.0
+
+
+@dataclass
+class DegreeDayResult:
+    """Data class for vectorized degree-day results"""
+    parameter_sets: List[Tuple[float, float]]
+    totals: np.ndarray          # (parameter sets, locations)
+    heating_days: np.ndarray    # (parameter sets, locations)
+    daily_values: np.ndarray    # (parameter sets, locations, days)
+    # Further metrics, None unless requested
+    heating_degree_days: Optional[np.ndarray] = None        # (parameter sets, locations)
+    cooling_degree_days: Optional[np.ndarray] = None        # (locations,)
+    cooling_days: Optional[np.ndarray] = None               # (locations,)
+    months: Optional[np.ndarray] = None                     # (months,) datetime64[M]
+    monthly_totals: Optional[np.ndarray] = None             # (parameter sets, locations, months)
+    monthly_heating_days: Optional[np.ndarray] = None       # (parameter sets, locations, months)
+    monthly_heating_degree_days: Optional[np.ndarray] = None  # (parameter sets, locations, months)
+    monthly_mean_temperatures: Optional[np.ndarray] = None  # (locations, months), NaN without data
+    monthly_valid_days: Optional[np.ndarray] = None         # (locations, months)
+
+
+def calculate_degree_days(
+    temperatures: np.ndarray,
+    parameter_sets: Sequence[Tuple[float, float]],
+    metrics: Sequence[str] = ('gradtagszahl',),
+    start_date: Optional[str] = None,
+    cooling_base: float = DEFAULT_COOLING_BASE
+    ) -> DegreeDayResult:
+    """
+    Calculate heating degree days according to VDI 2067 for many locations
+    and (room_temperature, heating_limit) combinations in a single pass
+
+    Further metrics are derived from the same heating mask and daily
+    values instead of separate loops:
+    - heating_degree_days: Heizgradtage, Σ(heating_limit - outdoor_temp)
+      over the heating days, i.e. only the base temperature counts
+    - cooling_degree_days: Σ(outdoor_temp - cooling_base) over the days
+      above cooling_base, with the number of those days
+    - monthly: Gradtagszahl, heating days, Heizgradtage and mean outdoor
+      temperature per calendar month, as used by the monthly balance
+      method of DIN V 4108-6
+
+    Args:
+        temperatures: Daily mean temperatures as (locations, days) array,
+            NaN marks days without data; a 1-D array counts as one location
+        parameter_sets: Sequence of (room_temperature, heating_limit) tuples
+        metrics: Metrics from METRICS to calculate
+        start_date: Date of the first day ('YYYY-MM-DD'), required for 'monthly'
+        cooling_base: Base temperature of the cooling degree days in °C
+
+    Returns:
+        DegreeDayResult with totals, heating day counts and per-day values,
+        plus the requested metrics
+
+    Raises:
+        ValueError: For invalid shapes, unknown metrics or 'monthly'
+            without start_date
+    """
+    temps = np.asarray(temperatures, dtype=np.float64)
+    if temps.ndim == 1:
+        temps = temps[np.newaxis, :]
+    if temps.ndim != 2:
+        raise ValueError("Temperatures must be a (locations, days) array")
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+    if 'monthly' in metrics and start_date is None:
+        raise ValueError("Monthly values require the start date")
+
+    params = np.asarray(parameter_sets, dtype=np.float64).reshape(-1, 2)
+    room_temperatures = params[:, 0, np.newaxis, np.newaxis]
+    heating_limits = params[:, 1, np.newaxis, np.newaxis]
+
+    # Heating day: outdoor_temp < heating_limit, NaN compares as False
+    heating = temps[np.newaxis, :, :] < heating_limits
+    daily_values = np.where(heating, room_temperatures - temps[np.newaxis, :, :], 0.0)
+
+    result = DegreeDayResult(
+        parameter_sets=[(float(room), float(limit)) for room, limit in params],
+        totals=daily_values.sum(axis=2),
+        heating_days=heating.sum(axis=2),
+        daily_values=daily_values)
+
+    # Σ(limit - T) = Σ(room - T) - (room - limit) per heating day, no second daily array needed
+    offsets = (params[:, 0] - params[:, 1])[:, np.newaxis]
+    if 'heating_degree_days' in metrics:
+        result.heating_degree_days = result.totals - offsets * result.heating_days
+
+    if 'cooling_degree_days' in metrics:
+        cooling = temps > cooling_base
+        result.cooling_degree_days = np.where(cooling, temps - cooling_base, 0.0).sum(axis=1)
+        result.cooling_days = cooling.sum(axis=1)
+
+    if 'monthly' in metrics:
+        days = np.datetime64(start_date, 'D') + np.arange(temps.shape[1])
+        months = days.astype('datetime64[M]')
+        # Column of the first day of every month, the reductions run over these segments
+        boundaries = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+        result.months = months[boundaries]
+        result.monthly_totals = np.add.reduceat(daily_values, boundaries, axis=2)
+        result.monthly_heating_days = np.add.reduceat(heating, boundaries, axis=2, dtype=np.int64)
+        result.monthly_heating_degree_days = \
+            result.monthly_totals - offsets[:, :, np.newaxis] * result.monthly_heating_days
+        valid = ~np.isnan(temps)
+        result.monthly_valid_days = np.add.reduceat(valid, boundaries, axis=1, dtype=np.int64)
+        sums = np.add.reduceat(np.where(valid, temps, 0.0), boundaries, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result.monthly_mean_temperatures = np.where(
+                result.monthly_valid_days > 0, sums / result.monthly_valid_days, np.nan)
+
+    return result
@@ -0,0 +1,365 @@
+import csv
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from Library.gradtagszahlenCalculator import CalculationResult
+
+SUMMARY_COLUMNS = [
+    'city_name', 'period_start', 'period_end', 'room_temperature', 'heating_limit',
+    'gradtagszahl', 'heating_days_count', 'mean_temperature',
+    'heating_degree_days', 'cooling_degree_days', 'cooling_days_count']
+DAILY_COLUMNS = [
+    'city_name', 'room_temperature', 'heating_limit', 'date', 'temperature', 'gradtag']
+MONTHLY_COLUMNS = [
+    'city_name', 'room_temperature', 'heating_limit', 'month', 'gradtagszahl',
+    'heating_days_count', 'heating_degree_days', 'mean_temperature', 'valid_days']
+
+# Rows of an Excel worksheet, including the header row
+EXCEL_MAX_ROWS = 1048576
+
+
+def summary_row(result: CalculationResult) -> List:
+    """Summary values of a result in SUMMARY_COLUMNS order"""
+    mean_temperature = result.mean_temperature
+    return [
+        result.city_name, result.period_start, result.period_end,
+        result.room_temperature, result.heating_limit,
+        result.gradtagszahl, result.heating_days_count,
+        None if mean_temperature is None or np.isnan(mean_temperature) else mean_temperature,
+        result.heating_degree_days, result.cooling_degree_days, result.cooling_days_count]
+
+
+def monthly_rows(result: CalculationResult) -> List[List]:
+    """Monthly values of a result in MONTHLY_COLUMNS order, empty unless requested"""
+    return [
+        [result.city_name, result.room_temperature, result.heating_limit, month.month,
+         month.gradtagszahl, month.heating_days_count, month.heating_degree_days,
+         month.mean_temperature, month.valid_days]
+        for month in result.monthly or []]
+
+
+def daily_columns(result: CalculationResult) -> Dict[str, np.ndarray]:
+    """Per-day columns of a result, keyed by DAILY_COLUMNS, empty without series"""
+    if result.series is None:
+        return {column: np.array([]) for column in DAILY_COLUMNS}
+    days = len(result.series)
+    daily_values = result.daily_values if result.daily_values is not None else np.full(days, np.nan)
+    return {
+        'city_name': np.full(days, result.city_name, dtype=object),
+        'room_temperature': np.full(days, result.room_temperature),
+        'heating_limit': np.full(days, result.heating_limit),
+        'date': result.series.dates,
+        'temperature': result.series.values,
+        'gradtag': daily_values}
+
+
+class ResultExporter(ABC):
+    """
+    Base class for exporters writing results one by one as they arrive
+
+    Every exporter writes a summary table with one row per result; results
+    with daily values add a daily table with one row per day and result,
+    results with monthly values a monthly table. Only the current result is held in
+    memory, so exports of thousands of cities stay flat.
+    """
+
+    extensions = ()
+
+    def __init__(self, path: str):
+        """
+        Initialize the exporter
+
+        Args:
+            path: Target path of the summary; the daily table is written
+                next to it or into the same file, depending on the format
+        """
+        self.path = path
+        self.count = 0
+        self.logger = logging.getLogger(__name__)
+
+    @abstractmethod
+    def write_result(self, result: CalculationResult) -> None:
+        """Write the summary row and the daily rows of one result"""
+
+    def write_results(self, results: Iterable[CalculationResult]) -> None:
+        """Write several results"""
+        for result in results:
+            self.write_result(result)
+
+    def close(self) -> None:
+        """Finish the files"""
+        self.logger.info(f"Exported {self.count} results to {self.path}")
+
+    def __enter__(self) -> 'ResultExporter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def daily_path(self, extension: str) -> str:
+        """Path of a separate daily table next to the summary"""
+        return self.table_path('daily', extension)
+
+    def table_path(self, table: str, extension: str) -> str:
+        """Path of a separate table next to the summary, e.g. <name>_monthly.csv"""
+        stem, _ = os.path.splitext(self.path)
+        return f"{stem}_{table}{extension}"
+
+
+class CsvExporter(ResultExporter):
+    """
+    Writes <name>.csv with the summary and, for results with daily or
+    monthly values, <name>_daily.csv and <name>_monthly.csv
+    """
+
+    extensions = ('.csv',)
+
+    def __init__(self, path: str, delimiter: str = ';'):
+        """
+        Initialize the exporter
+
+        Args:
+            path: Target path of the summary CSV
+            delimiter: Field delimiter (default ';' for German Excel)
+        """
+        super().__init__(path)
+        self.delimiter = delimiter
+        self._daily_file = None
+        self._daily = None
+        self._monthly_file = None
+        self._monthly = None
+        self._summary_file = open(path, 'w', encoding='utf-8', newline='')
+        self._summary = csv.writer(self._summary_file, delimiter=delimiter)
+        self._summary.writerow(SUMMARY_COLUMNS)
+
+    def write_result(self, result: CalculationResult) -> None:
+        self._summary.writerow(['' if value is None else value for value in summary_row(result)])
+        columns = daily_columns(result)
+        if len(columns['date']):
+            if self._daily is None:
+                # Only created once a result brings daily values, sweeps have none
+                self._daily_file = open(self.daily_path('.csv'), 'w', encoding='utf-8', newline='')
+                self._daily = csv.writer(self._daily_file, delimiter=self.delimiter)
+                self._daily.writerow(DAILY_COLUMNS)
+            dates = np.datetime_as_string(columns['date'])
+            for date, temperature, gradtag in zip(dates, columns['temperature'], columns['gradtag']):
+                self._daily.writerow([
+                    result.city_name, result.room_temperature, result.heating_limit, date,
+                    '' if np.isnan(temperature) else round(float(temperature), 2),
+                    '' if np.isnan(gradtag) else round(float(gradtag), 2)])
+            self._daily_file.flush()
+        rows = monthly_rows(result)
+        if rows:
+            if self._monthly is None:
+                # Only created once a result brings monthly values
+                self._monthly_file = open(self.table_path('monthly', '.csv'), 'w', encoding='utf-8', newline='')
+                self._monthly = csv.writer(self._monthly_file, delimiter=self.delimiter)
+                self._monthly.writerow(MONTHLY_COLUMNS)
+            self._monthly.writerows([['' if value is None else value for value in row] for row in rows])
+            self._monthly_file.flush()
+        self._summary_file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self._summary_file.close()
+        if self._daily_file is not None:
+            self._daily_file.close()
+        if self._monthly_file is not None:
+            self._monthly_file.close()
+        super().close()
+
+
+class ParquetExporter(ResultExporter):
+    """
+    Writes <name>.parquet with the summary and, for results with daily
+    values, <name>_daily.parquet with one row group per result; monthly
+    values are collected into <name>_monthly.parquet
+
+    Requires pyarrow.
+    """
+
+    extensions = ('.parquet',)
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+        super().__init__(path)
+        self._pa = pa
+        self._pq = pq
+        self._summary_schema = pa.schema([
+            ('city_name', pa.string()), ('period_start', pa.string()), ('period_end', pa.string()),
+            ('room_temperature', pa.float64()), ('heating_limit', pa.float64()),
+            ('gradtagszahl', pa.float64()), ('heating_days_count', pa.int64()),
+            ('mean_temperature', pa.float64()), ('heating_degree_days', pa.float64()),
+            ('cooling_degree_days', pa.float64()), ('cooling_days_count', pa.int64())])
+        self._daily_schema = pa.schema([
+            ('city_name', pa.string()), ('room_temperature', pa.float64()),
+            ('heating_limit', pa.float64()), ('date', pa.date32()),
+            ('temperature', pa.float64()), ('gradtag', pa.float64())])
+        self._monthly_schema = pa.schema([
+            ('city_name', pa.string()), ('room_temperature', pa.float64()),
+            ('heating_limit', pa.float64()), ('month', pa.string()),
+            ('gradtagszahl', pa.float64()), ('heating_days_count', pa.int64()),
+            ('heating_degree_days', pa.float64()), ('mean_temperature', pa.float64()),
+            ('valid_days', pa.int64())])
+        self._summary_rows: List[List] = []
+        self._monthly_rows: List[List] = []
+        self._daily = None
+        self._summary_writer = pq.ParquetWriter(path, self._summary_schema)
+
+    def write_result(self, result: CalculationResult) -> None:
+        # Summary and monthly rows are small and written as one row group on close
+        self._summary_rows.append(summary_row(result))
+        self._monthly_rows.extend(monthly_rows(result))
+        columns = daily_columns(result)
+        if len(columns['date']):
+            # No daily file or empty row groups for results without series, e.g. from sweeps
+            if self._daily is None:
+                self._daily = self._pq.ParquetWriter(self.daily_path('.parquet'), self._daily_schema)
+            arrays = [
+                self._pa.array(columns[name], type=field.type, from_pandas=True)
+                for name, field in zip(DAILY_COLUMNS, self._daily_schema)]
+            self._daily.write_table(self._pa.Table.from_arrays(arrays, schema=self._daily_schema))
+        self.count += 1
+
+    def close(self) -> None:
+        self._summary_writer.write_table(self._rows_table(self._summary_rows, self._summary_schema))
+        self._summary_writer.close()
+        if self._daily is not None:
+            self._daily.close()
+        if self._monthly_rows:
+            self._pq.write_table(
+                self._rows_table(self._monthly_rows, self._monthly_schema),
+                self.table_path('monthly', '.parquet'))
+        super().close()
+
+    def _rows_table(self, rows: List[List], schema):
+        """pyarrow table of row lists in schema order"""
+        columns = list(zip(*rows)) if rows else [[]] * len(schema)
+        arrays = [self._pa.array(list(values), type=field.type) for values, field in zip(columns, schema)]
+        return self._pa.Table.from_arrays(arrays, schema=schema)
+
+
+class _ExcelTable:
+    """
+    Rows of one table in a write-only workbook, continued on further
+    sheets ('Tageswerte 2', ...) when a sheet reaches EXCEL_MAX_ROWS
+    """
+
+    def __init__(self, workbook, title: str, header: List[str], max_rows: int = EXCEL_MAX_ROWS):
+        self.workbook = workbook
+        self.title = title
+        self.header = header
+        self.max_rows = max_rows
+        self.sheets = 0
+        self._sheet = None
+        self._rows = 0
+        self._add_sheet()
+
+    def _add_sheet(self) -> None:
+        self.sheets += 1
+        title = self.title if self.sheets == 1 else f"{self.title} {self.sheets}"
+        self._sheet = self.workbook.create_sheet(title)
+        self._sheet.append(self.header)
+        self._rows = 1
+
+    def append(self, row: List) -> None:
+        # openpyxl does not check the limit, Excel cannot open sheets beyond it
+        if self._rows >= self.max_rows:
+            self._add_sheet()
+        self._sheet.append(row)
+        self._rows += 1
+
+
+class ExcelExporter(ResultExporter):
+    """
+    Writes an .xlsx workbook with the sheet 'Ergebnisse', plus 'Tageswerte'
+    and 'Monatswerte' for results with daily or monthly values
+
+    Uses openpyxl's write-only mode, which streams rows to disk. A sheet
+    holds at most EXCEL_MAX_ROWS rows, about 2,900 city-years of daily
+    values; further rows continue on 'Tageswerte 2', 'Tageswerte 3', ...
+    """
+
+    extensions = ('.xlsx',)
+
+    def __init__(self, path: str):
+        try:
+            import openpyxl
+        except ImportError:
+            raise ImportError("Excel export requires openpyxl (pip install openpyxl)")
+        super().__init__(path)
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._summary = _ExcelTable(self._workbook, 'Ergebnisse', SUMMARY_COLUMNS)
+        self._daily = None
+        self._monthly = None
+
+    def write_result(self, result: CalculationResult) -> None:
+        self._summary.append(summary_row(result))
+        columns = daily_columns(result)
+        if len(columns['date']) and self._daily is None:
+            self._daily = _ExcelTable(self._workbook, 'Tageswerte', DAILY_COLUMNS)
+        for date, temperature, gradtag in zip(
+                columns['date'].tolist(), columns['temperature'].tolist(), columns['gradtag'].tolist()):
+            self._daily.append([
+                result.city_name, result.room_temperature, result.heating_limit, date,
+                None if np.isnan(temperature) else temperature,
+                None if np.isnan(gradtag) else gradtag])
+        rows = monthly_rows(result)
+        if rows and self._monthly is None:
+            self._monthly = _ExcelTable(self._workbook, 'Monatswerte', MONTHLY_COLUMNS)
+        for row in rows:
+            self._monthly.append(row)
+        self.count += 1
+
+    def close(self) -> None:
+        if self._daily is not None and self._daily.sheets > 1:
+            self.logger.info(f"Daily values split over {self._daily.sheets} sheets")
+        self._workbook.save(self.path)
+        super().close()
+
+
+EXPORTERS = (CsvExporter, ParquetExporter, ExcelExporter)
+
+
+def create_exporter(path: str) -> ResultExporter:
+    """
+    Create the exporter matching the file extension of a path
+
+    Args:
+        path: Target path ending in .csv, .parquet or .xlsx
+
+    Returns:
+        ResultExporter instance
+
+    Raises:
+        ValueError: For unsupported file extensions
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for exporter in EXPORTERS:
+        if extension in exporter.extensions:
+            return exporter(path)
+    raise ValueError(f"Unsupported export format: {extension}")
+
+
+def export_results(path: str, results: Iterable[CalculationResult]) -> int:
+    """
+    Export results in the format given by the file extension
+
+    Args:
+        path: Target path ending in .csv, .parquet or .xlsx
+        results: CalculationResults to write
+
+    Returns:
+        Number of exported results
+    """
+    with create_exporter(path) as exporter:
+        exporter.write_results(results)
+    return exporter.count
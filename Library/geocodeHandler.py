@@ -0,0 +1,242 @@
+import csv
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from Library.crudHandler import CrudHandler
+
+DEFAULT_GEOCODE_CACHE_FILE = os.path.join(
+    os.path.expanduser('~'), '.gradtagszahlen', 'geocode_cache.json')
+
+# Column names accepted for the address and the display name in import files
+ADDRESS_COLUMNS = ('address', 'adresse', 'anschrift')
+NAME_COLUMNS = ('name', 'bezeichnung', 'objekt')
+
+
+def normalize_address(address: str) -> str:
+    """Normalize an address for deduplication and cache lookups"""
+    return ' '.join(address.replace(',', ', ').split()).lower()
+
+
+def read_table(path: str) -> List[List[str]]:
+    """
+    Read all rows of a CSV or Excel file as strings
+
+    Args:
+        path: Path to a .csv, .txt or .xlsx file
+
+    Returns:
+        List of rows, the first row being the header
+
+    Raises:
+        ValueError: If the file type is unsupported
+        ImportError: If an Excel file is read without openpyxl installed
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.csv', '.txt'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+            except csv.Error:
+                dialect = csv.excel
+            return list(csv.reader(f, dialect))
+    if extension in ('.xlsx', '.xlsm'):
+        try:
+            import openpyxl
+        except ImportError:
+            raise ImportError("Reading Excel files requires openpyxl (pip install openpyxl)")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            return [
+                ['' if cell is None else str(cell) for cell in row]
+                for row in workbook.active.iter_rows(values_only=True)]
+        finally:
+            workbook.close()
+    raise ValueError(f"Unsupported file type: {extension}")
+
+
+def read_address_file(path: str) -> List[Dict[str, str]]:
+    """
+    Read addresses from a CSV or Excel file
+
+    The file needs a header row with an address column ('address',
+    'Adresse' or 'Anschrift'); a name column ('name', 'Bezeichnung' or
+    'Objekt') is optional.
+
+    Args:
+        path: Path to a .csv, .txt or .xlsx file
+
+    Returns:
+        List of dictionaries with 'address' and 'name' (may be empty)
+
+    Raises:
+        ValueError: If the file type is unsupported or has no address column
+        ImportError: If an Excel file is read without openpyxl installed
+    """
+    rows = read_table(path)
+    if not rows:
+        return []
+
+    header = [column.strip().lower() for column in rows[0]]
+    address_index = next((header.index(c) for c in ADDRESS_COLUMNS if c in header), None)
+    if address_index is None:
+        raise ValueError(f"No address column found, expected one of {ADDRESS_COLUMNS}")
+    name_index = next((header.index(c) for c in NAME_COLUMNS if c in header), None)
+
+    entries = []
+    for row in rows[1:]:
+        if address_index >= len(row) or not row[address_index].strip():
+            continue
+        name = row[name_index].strip() if name_index is not None and name_index < len(row) else ''
+        entries.append({'address': row[address_index].strip(), 'name': name})
+    return entries
+
+
+class GeocodeCache:
+    """Persistent JSON cache of geocoding results, including misses"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the cache and load existing entries
+
+        Args:
+            path: Path of the JSON cache file (created on first save)
+        """
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Optional[Dict]] = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (ValueError, OSError) as e:
+                self.logger.warning(f"Ignoring unreadable geocode cache {path}: {e}")
+
+    def __contains__(self, address: str) -> bool:
+        return normalize_address(address) in self._entries
+
+    def get(self, address: str) -> Optional[Dict]:
+        """Cached result of an address, None if unknown or not found"""
+        return self._entries.get(normalize_address(address))
+
+    def set(self, address: str, result: Optional[Dict]) -> None:
+        """Store a result (None for addresses that were not found)"""
+        with self._lock:
+            self._entries[normalize_address(address)] = result
+
+    def save(self) -> None:
+        """Write the cache to disk atomically"""
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class Geocoder:
+    """
+    Nominatim geocoder with a persistent cache
+
+    Requests are limited to Nominatim's usage policy of one per second and
+    only made for addresses that are not cached yet.
+    """
+
+    def __init__(
+        self,
+        cache: GeocodeCache,
+        base_url: str = "https://nominatim.openstreetmap.org",
+        requests_per_second: float = 1.0
+        ):
+        """
+        Initialize the geocoder
+
+        Args:
+            cache: GeocodeCache for previously looked up addresses
+            base_url: Base URL of the Nominatim API
+            requests_per_second: Request limit (Nominatim allows at most 1)
+        """
+        self.cache = cache
+        self.crud_handler = CrudHandler(base_url, timeout=10, requests_per_second=requests_per_second)
+        self.logger = logging.getLogger(__name__)
+
+    def geocode(self, address: str) -> Optional[Dict]:
+        """
+        Geocode a single address
+
+        Args:
+            address: Free-form address
+
+        Returns:
+            Dictionary with 'lat', 'lon' and 'display_name', None if not found
+
+        Raises:
+            requests.RequestException: For HTTP errors
+        """
+        if address in self.cache:
+            return self.cache.get(address)
+
+        params = {'q': address, 'format': 'json', 'limit': 1, 'addressdetails': 1}
+        data = self.crud_handler.get('search', params)
+        result = None
+        if data:
+            result = {
+                'lat': float(data[0]['lat']),
+                'lon': float(data[0]['lon']),
+                'display_name': data[0].get('display_name', address)}
+        self.cache.set(address, result)
+        self.cache.save()
+        return result
+
+    def geocode_many(
+        self,
+        addresses: List[str],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+        ) -> Dict[str, Optional[Dict]]:
+        """
+        Geocode many addresses, looking up every distinct address only once
+
+        Each result is cached right away, so an interrupted import resumes
+        where it stopped when started again.
+
+        Args:
+            addresses: Free-form addresses, duplicates allowed
+            progress_callback: Called with (finished addresses, distinct addresses)
+            cancel_event: Stops further lookups once set
+
+        Returns:
+            Dictionary with the addresses as keys and the geocode results
+            (None if not found or failed) as values; addresses skipped after
+            a cancel are missing
+        """
+        distinct = {}
+        for address in addresses:
+            distinct.setdefault(normalize_address(address), address)
+
+        cached = sum(1 for address in distinct.values() if address in self.cache)
+        self.logger.info(
+            f"Geocoding {len(distinct)} distinct addresses ({cached} cached) "
+            f"out of {len(addresses)}")
+
+        results = {}
+        for finished, address in enumerate(distinct.values(), start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            try:
+                results[address] = self.geocode(address)
+            except Exception as e:
+                self.logger.error(f"Geocoding failed for '{address}': {e}")
+                results[address] = None
+            if progress_callback is not None:
+                progress_callback(finished, len(distinct))
+
+        return {
+            address: results[distinct[normalize_address(address)]]
+            for address in addresses if distinct[normalize_address(address)] in results}
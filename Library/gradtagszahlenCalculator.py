@@ -1,8 +1,24 @@
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+import os
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import partial
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple, Optional, Union
+from dataclasses import dataclass, field, asdict
 from Library.crudHandler import CrudHandler
+from Library.cacheHandler import TemperatureCache
+from Library.degreeDayEngine import DEFAULT_COOLING_BASE, METRICS, DegreeDayResult, calculate_degree_days
+from Library.temperatureSeries import TemperatureSeries
+from Library.timingHandler import tracer
+from Library.requestCoalescer import RequestCoalescer, Cell, DEFAULT_GRID_RESOLUTION
+from Library.locationIndex import LocationIndex
+from Library.dataSource import DailySeries, period_days, OpenMeteoSource, TemperatureSource
+from Library.seriesStore import SeriesStore
+from Library.sweepEngine import SharedMatrix, SweepResult, calculate_sweep, pool_size
 from accessify import protected
 
 @dataclass
@@ -12,6 +28,16 @@ class CityData:
     latitude: float
     longitude: float
 
+@dataclass
+class MonthlyValues:
+    """Data class for the values of one calendar month (DIN V 4108-6 monthly method)"""
+    month: str                  # 'YYYY-MM'
+    gradtagszahl: float
+    heating_days_count: int
+    heating_degree_days: float
+    mean_temperature: Optional[float]
+    valid_days: int
+
 @dataclass
 class CalculationResult:
     """Data class for calculation results"""
@@ -22,6 +48,44 @@ class CalculationResult:
     period_end: str
     room_temperature: float
     heating_limit: float
+    # Fetched daily series and per-day degree values on the same date index
+    series: Optional[TemperatureSeries] = field(default=None, repr=False)
+    daily_values: Optional[np.ndarray] = field(default=None, repr=False)
+    # Further metrics, None unless requested
+    heating_degree_days: Optional[float] = None
+    cooling_degree_days: Optional[float] = None
+    cooling_days_count: Optional[int] = None
+    monthly: Optional[List[MonthlyValues]] = field(default=None, repr=False)
+
+    @property
+    def mean_temperature(self) -> Optional[float]:
+        """Mean daily temperature of the period, None without series data"""
+        if self.series is None:
+            return None
+        return self.series.mean()
+
+    @property
+    def dates(self) -> List[str]:
+        """Date strings of the days with data"""
+        return self.series.valid_dates() if self.series is not None else []
+
+    @property
+    def temperatures(self) -> List[float]:
+        """Temperatures of the days with data"""
+        return self.series.valid_values() if self.series is not None else []
+
+@dataclass
+class RollingState:
+    """Data class for the running totals of an ongoing heating season"""
+    city_name: str
+    season_start: str
+    room_temperature: float
+    heating_limit: float
+    last_date: Optional[str] = None
+    gradtagszahl: float = 0.0
+    heating_days_count: int = 0
+    # Temperatures of the trailing days the archive may still revise
+    recent_temperatures: Dict[str, float] = field(default_factory=dict)
 
 class GradtagszahlenCalculator:
     """
@@ -31,14 +95,43 @@ class GradtagszahlenCalculator:
     Heating day: outdoor_temp < heating_limit
     """
     
-    def __init__(self, crud_handler: CrudHandler):
+    def __init__(
+        self,
+        crud_handler: Optional[CrudHandler],
+        cache: Optional[Union[TemperatureCache, SeriesStore]] = None,
+        timezone: str = 'auto',
+        grid_resolution: Optional[float] = DEFAULT_GRID_RESOLUTION,
+        source: Optional[TemperatureSource] = None
+        ):
         """
         Initialize calculator with CRUD handler
         
         Args:
-            crud_handler: Instance of CrudHandler for API requests
+            crud_handler: Instance of CrudHandler for API requests, may be None
+                if a source is given
+            cache: Optional TemperatureCache or SeriesStore to avoid
+                re-fetching archive data, ignored for local sources
+            timezone: Time zone of the daily aggregation; 'auto' makes the API
+                look up the local zone of every location, 'GMT' skips the lookup
+                when days in UTC are acceptable
+            grid_resolution: Grid spacing in degrees; locations in the same
+                cell share one request and the series of one of them. None
+                (default) only merges identical coordinates; ARCHIVE_GRID_RESOLUTION
+                saves requests for dense portfolios but changes the results,
+                because the archive downscales to every requested point
+            source: Source of the temperatures, defaults to the Open-Meteo
+                archive via crud_handler (see Library.dataSource for local files)
         """
+        if source is None:
+            if crud_handler is None:
+                raise ValueError("Either a CrudHandler or a source is required")
+            source = OpenMeteoSource(crud_handler, timezone)
         self.crud_handler = crud_handler
+        self.source = source
+        self.cache = cache if source.cacheable else None
+        self.coalescer = RequestCoalescer(grid_resolution)
+        self.location_index: Optional[LocationIndex] = None  # Index of the last fetch
+        self.rolling_states: Dict[str, RollingState] = {}
         self.logger = logging.getLogger(__name__)
         
     def calculate_for_cities(
@@ -47,7 +140,14 @@ class GradtagszahlenCalculator:
         start_date: str,
         end_date: str,
         room_temperature: float = 20.0,
-        heating_limit: float = 15.0
+        heating_limit: float = 15.0,
+        max_workers: int = 1,
+        batch_size: int = 1,
+        result_callback: Optional[Callable[[CalculationResult], None]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        metrics: Sequence[str] = ('gradtagszahl',),
+        cooling_base: float = DEFAULT_COOLING_BASE
         ) -> Dict[str, CalculationResult]:
         """
         Calculate heating degree days for multiple cities
@@ -58,60 +158,714 @@ class GradtagszahlenCalculator:
             end_date: End date in format 'YYYY-MM-DD'
             room_temperature: Target indoor temperature (default: 20°C)
             heating_limit: Temperature below which heating is needed (default: 15°C)
+            max_workers: Number of cities fetched concurrently (default: 1, sequential)
+            batch_size: Number of cities combined into one API request (default: 1)
+            result_callback: Called with every CalculationResult as soon as its city arrives
+            progress_callback: Called with (finished cities, total cities)
+            cancel_event: Stops fetching further cities once set
+            metrics: Metrics to calculate, see Library.degreeDayEngine.METRICS
+            cooling_base: Base temperature of the cooling degree days in °C
             
         Returns:
-            Dictionary with city names as keys and CalculationResult as values
+            Dictionary with city names as keys and CalculationResult as values,
+            each carrying the fetched daily series
             
         Raises:
             ValueError: For invalid date formats or parameters
             Exception: For API or calculation errors
         """
+        parameter_set = (room_temperature, heating_limit)
+        results = self.calculate_for_parameter_sets(
+            cities, start_date, end_date, [parameter_set],
+            max_workers=max_workers, batch_size=batch_size,
+            result_callback=result_callback, progress_callback=progress_callback,
+            cancel_event=cancel_event, metrics=metrics, cooling_base=cooling_base)
+        return results[parameter_set]
+    
+    def calculate_for_parameter_sets(
+        self,
+        cities: List[CityData],
+        start_date: str,
+        end_date: str,
+        parameter_sets: List[Tuple[float, float]],
+        max_workers: int = 1,
+        batch_size: int = 1,
+        result_callback: Optional[Callable[[CalculationResult], None]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        metrics: Sequence[str] = ('gradtagszahl',),
+        cooling_base: float = DEFAULT_COOLING_BASE
+        ) -> Dict[Tuple[float, float], Dict[str, CalculationResult]]:
+        """
+        Calculate heating degree days for multiple cities and several
+        (room_temperature, heating_limit) combinations, e.g. 18/12, 20/15
+        and 21/15, fetching every city only once
+        
+        Args:
+            cities: List of CityData objects
+            start_date: Start date in format 'YYYY-MM-DD'
+            end_date: End date in format 'YYYY-MM-DD'
+            parameter_sets: List of (room_temperature, heating_limit) tuples
+            max_workers: Number of cities fetched concurrently (default: 1, sequential)
+            batch_size: Number of cities combined into one API request (default: 1)
+            result_callback: Called with every CalculationResult as soon as its
+                city arrives; cities are then calculated one by one
+            progress_callback: Called with (finished cities, total cities)
+            cancel_event: Stops fetching further cities once set, the results
+                of the cities finished so far are returned
+            metrics: Metrics to calculate, see Library.degreeDayEngine.METRICS;
+                all are computed in the same pass over the series
+            cooling_base: Base temperature of the cooling degree days in °C
+            
+        Returns:
+            Dictionary with parameter sets as keys and dictionaries of
+            city names and CalculationResult as values
+            
+        Raises:
+            ValueError: For invalid date formats or parameters
+        """
         self.logger.info(f"Starting calculation for {len(cities)} cities")
         self.logger.info(f"Period: {start_date} to {end_date}")
-        self.logger.info(f"Room temp: {room_temperature}°C, Heating limit: {heating_limit}°C")
         
         # Validate inputs
-        self._validate_inputs(cities, start_date, end_date, room_temperature, heating_limit)
+        if not parameter_sets:
+            raise ValueError("Parameter sets cannot be empty")
+        self._validate_metrics(metrics)
+        parameter_sets = [(float(room), float(limit)) for room, limit in parameter_sets]
+        for room_temperature, heating_limit in parameter_sets:
+            self.logger.info(f"Room temp: {room_temperature}°C, Heating limit: {heating_limit}°C")
+            self._validate_inputs(cities, start_date, end_date, room_temperature, heating_limit)
+        
+        series_list = [None] * len(cities)
+        streamed = {}
+        finished = 0
+        for index, series in self._iter_series_for_cities(
+                cities, start_date, end_date, max_workers, batch_size, cancel_event):
+            series_list[index] = series
+            finished += 1
+            if result_callback is not None and series is not None:
+                streamed[index] = self._calculate_results(
+                    [cities[index]], [series], start_date, end_date, parameter_sets,
+                    metrics, cooling_base)
+                for parameter_set in parameter_sets:
+                    result_callback(streamed[index][parameter_set][cities[index].name])
+            if progress_callback is not None:
+                progress_callback(finished, len(cities))
+        
+        if result_callback is None:
+            results = self._calculate_results(
+                cities, series_list, start_date, end_date, parameter_sets, metrics, cooling_base)
+        else:
+            # Already calculated while streaming, merge in city order
+            results = {parameter_set: {} for parameter_set in parameter_sets}
+            for index in sorted(streamed):
+                for parameter_set in parameter_sets:
+                    results[parameter_set].update(streamed[index][parameter_set])
+        
+        self.logger.info(
+            f"Calculation completed for {sum(series is not None for series in series_list)}"
+            f"/{len(cities)} cities")
+        return results
+    
+    def calculate_for_periods(
+        self,
+        cities: List[CityData],
+        periods: List[Tuple[str, str]],
+        room_temperature: float = 20.0,
+        heating_limit: float = 15.0,
+        max_workers: int = 1,
+        batch_size: int = 1,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        metrics: Sequence[str] = ('gradtagszahl',),
+        cooling_base: float = DEFAULT_COOLING_BASE
+        ) -> Dict[str, Dict[Tuple[str, str], CalculationResult]]:
+        """
+        Compare several periods, e.g. the last ten heating seasons
+        
+        The range covering all periods is fetched once per city and every
+        period is sliced from it in memory, so ten seasons cost one fetch
+        per city instead of ten.
+        
+        Args:
+            cities: List of CityData objects
+            periods: List of (start_date, end_date) tuples in format 'YYYY-MM-DD'
+            room_temperature: Desired room temperature in °C (default: 20.0)
+            heating_limit: Heating limit temperature in °C (default: 15.0)
+            max_workers: Number of cities fetched concurrently (default: 1, sequential)
+            batch_size: Number of cities combined into one API request (default: 1)
+            progress_callback: Called with (finished cities, total cities)
+            cancel_event: Stops fetching further cities once set
+            metrics: Metrics to calculate, see Library.degreeDayEngine.METRICS
+            cooling_base: Base temperature of the cooling degree days in °C
+            
+        Returns:
+            Dictionary with city names as keys and dictionaries of periods
+            and CalculationResult as values; periods without any data for a
+            city are missing
+            
+        Raises:
+            ValueError: For invalid date formats or parameters
+        """
+        parameter_set = (float(room_temperature), float(heating_limit))
+        results = self.calculate_periods_for_parameter_sets(
+            cities, periods, [parameter_set],
+            max_workers=max_workers, batch_size=batch_size,
+            progress_callback=progress_callback, cancel_event=cancel_event,
+            metrics=metrics, cooling_base=cooling_base)
+        return results[parameter_set]
+    
+    def calculate_periods_for_parameter_sets(
+        self,
+        cities: List[CityData],
+        periods: List[Tuple[str, str]],
+        parameter_sets: List[Tuple[float, float]],
+        max_workers: int = 1,
+        batch_size: int = 1,
+        result_callback: Optional[Callable[[CalculationResult], None]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        metrics: Sequence[str] = ('gradtagszahl',),
+        cooling_base: float = DEFAULT_COOLING_BASE
+        ) -> Dict[Tuple[float, float], Dict[str, Dict[Tuple[str, str], CalculationResult]]]:
+        """
+        Compare several periods for several (room_temperature, heating_limit)
+        combinations, fetching the range covering all periods once per city
+        
+        Args:
+            cities: List of CityData objects
+            periods: List of (start_date, end_date) tuples in format 'YYYY-MM-DD'
+            parameter_sets: List of (room_temperature, heating_limit) tuples
+            max_workers: Number of cities fetched concurrently (default: 1, sequential)
+            batch_size: Number of cities combined into one API request (default: 1)
+            result_callback: Called with every CalculationResult that has data
+                as soon as its city arrives; cities are then calculated one by one
+            progress_callback: Called with (finished cities, total cities)
+            cancel_event: Stops fetching further cities once set
+            metrics: Metrics to calculate, see Library.degreeDayEngine.METRICS
+            cooling_base: Base temperature of the cooling degree days in °C
+            
+        Returns:
+            Dictionary with parameter sets as keys and, per set, dictionaries
+            of city names and {period: CalculationResult}; periods without
+            any data for a city are missing
+            
+        Raises:
+            ValueError: For invalid date formats or parameters
+        """
+        if not periods:
+            raise ValueError("Periods cannot be empty")
+        if not parameter_sets:
+            raise ValueError("Parameter sets cannot be empty")
+        self._validate_metrics(metrics)
+        periods = [(start_date, end_date) for start_date, end_date in periods]
+        parameter_sets = [(float(room), float(limit)) for room, limit in parameter_sets]
+        for start_date, end_date in periods:
+            for room_temperature, heating_limit in parameter_sets:
+                self._validate_inputs(cities, start_date, end_date, room_temperature, heating_limit)
+        
+        # One range covering all periods, gaps between the periods are fetched too
+        range_start = min(start_date for start_date, _ in periods)
+        range_end = max(end_date for _, end_date in periods)
+        self.logger.info(
+            f"Comparing {len(periods)} periods for {len(cities)} cities, "
+            f"fetching {range_start} to {range_end}")
+        
+        series_list = [None] * len(cities)
+        streamed = {}
+        finished = 0
+        for index, series in self._iter_series_for_cities(
+                cities, range_start, range_end, max_workers, batch_size, cancel_event):
+            series_list[index] = series
+            finished += 1
+            if result_callback is not None and series is not None:
+                streamed[index] = {}
+                for period in periods:
+                    streamed[index][period] = self._calculate_results(
+                        [cities[index]], [series], *period, parameter_sets, metrics, cooling_base)
+                for period in periods:
+                    for parameter_set in parameter_sets:
+                        result = streamed[index][period][parameter_set][cities[index].name]
+                        if result.series.valid_count:
+                            result_callback(result)
+            if progress_callback is not None:
+                progress_callback(finished, len(cities))
+        
+        if result_callback is None:
+            period_results = {}
+            for period in periods:
+                period_results[period] = self._calculate_results(
+                    cities, series_list, *period, parameter_sets, metrics, cooling_base)
+        else:
+            # Already calculated while streaming, merge in city order
+            period_results = {
+                period: {parameter_set: {} for parameter_set in parameter_sets} for period in periods}
+            for index in sorted(streamed):
+                for period in periods:
+                    for parameter_set in parameter_sets:
+                        period_results[period][parameter_set].update(streamed[index][period][parameter_set])
+        
+        matrix = {
+            parameter_set: {city.name: {} for city, series in zip(cities, series_list) if series is not None}
+            for parameter_set in parameter_sets}
+        for period in periods:
+            for parameter_set in parameter_sets:
+                for name, result in period_results[period][parameter_set].items():
+                    if result.series.valid_count:
+                        matrix[parameter_set][name][period] = result
+        return matrix
+    
+    def calculate_sweep(
+        self,
+        cities: List[CityData],
+        periods: List[Tuple[str, str]],
+        parameter_sets: List[Tuple[float, float]],
+        processes: Optional[int] = None,
+        max_workers: int = 1,
+        batch_size: int = 1,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+        ) -> SweepResult:
+        """
+        Sensitivity sweep over every combination of period, parameter set
+        and city, returning totals only
+        
+        The range covering all periods is fetched once per city like in
+        calculate_for_periods(); the degree days are then computed on a
+        process pool working on shards of cities (see Library.sweepEngine).
+        No per-day values are kept, so sweeps of thousands of cities and
+        many parameter sets stay small.
+        
+        Args:
+            cities: List of CityData objects
+            periods: List of (start_date, end_date) tuples in format 'YYYY-MM-DD'
+            parameter_sets: List of (room_temperature, heating_limit) tuples
+            processes: Worker processes, defaults to the CPU count; 1 computes
+                in this process
+            max_workers: Number of cities fetched concurrently (default: 1, sequential)
+            batch_size: Number of cities combined into one API request (default: 1)
+            progress_callback: Called with (finished cities, total cities) while fetching
+            cancel_event: Stops fetching further cities once set
+            
+        Returns:
+            SweepResult; cities that failed have no valid days
+            
+        Raises:
+            ValueError: For invalid date formats or parameters
+        """
+        if not periods:
+            raise ValueError("Periods cannot be empty")
+        if not parameter_sets:
+            raise ValueError("Parameter sets cannot be empty")
+        for start_date, end_date in periods:
+            for room_temperature, heating_limit in parameter_sets:
+                self._validate_inputs(cities, start_date, end_date, room_temperature, heating_limit)
+        
+        range_start = min(start_date for start_date, _ in periods)
+        range_end = max(end_date for _, end_date in periods)
+        self.logger.info(
+            f"Sweeping {len(periods)} periods x {len(parameter_sets)} parameter sets "
+            f"for {len(cities)} cities, fetching {range_start} to {range_end}")
+        # Cities × days matrix over the covering range, NaN rows for failed cities. A
+        # process pool maps it from shared memory, so it is filled there right away
+        shape = (len(cities), len(period_days(range_start, range_end)))
+        parallel = pool_size(processes, len(cities)) > 1
+        with SharedMatrix(shape) if parallel else nullcontext(np.full(shape, np.nan)) as matrix:
+            self._fill_sweep_matrix(
+                matrix.array if parallel else matrix, cities, range_start, range_end,
+                max_workers, batch_size, progress_callback, cancel_event)
+            with tracer.span('degree_days', city=f"{len(cities)} cities"):
+                return calculate_sweep(
+                    matrix, range_start, periods, parameter_sets,
+                    names=[city.name for city in cities], processes=processes)
+    
+    @protected
+    def _fill_sweep_matrix(
+        self,
+        temperatures: np.ndarray,
+        cities: List[CityData],
+        start_date: str,
+        end_date: str,
+        max_workers: int,
+        batch_size: int,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+        ) -> None:
+        """Write the series of every city into its row as it arrives, without keeping the series"""
+        finished = 0
+        for index, series in self._iter_series_for_cities(
+                cities, start_date, end_date, max_workers, batch_size, cancel_event):
+            if series is not None:
+                temperatures[index] = series.slice(start_date, end_date).values
+            finished += 1
+            if progress_callback is not None:
+                progress_callback(finished, len(cities))
+    
+    def update_rolling(
+        self,
+        cities: List[CityData],
+        season_start: str,
+        end_date: Optional[str] = None,
+        room_temperature: float = 20.0,
+        heating_limit: float = 15.0,
+        revision_days: int = 5,
+        max_workers: int = 1,
+        batch_size: int = 1
+        ) -> Dict[str, CalculationResult]:
+        """
+        Incrementally update the heating degree days of an ongoing season
+        
+        Running totals and the last processed date are kept per city in
+        rolling_states, so only the days since the previous update are
+        fetched. The trailing revision_days days are taken back and
+        recomputed, because the archive may still revise recent values.
+        A city whose season or parameters changed starts over.
+        
+        Args:
+            cities: List of CityData objects
+            season_start: First day of the season in format 'YYYY-MM-DD'
+            end_date: Last day to include (default: today)
+            room_temperature: Target indoor temperature (default: 20°C)
+            heating_limit: Temperature below which heating is needed (default: 15°C)
+            revision_days: Number of trailing days recomputed on every update
+            max_workers: Number of cities fetched concurrently (default: 1, sequential)
+            batch_size: Number of cities combined into one API request (default: 1)
+            
+        Returns:
+            Dictionary with city names as keys and CalculationResult as values,
+            covering season_start to the last day with data
+        """
+        if end_date is None:
+            end_date = date.today().isoformat()
+        self._validate_inputs(cities, season_start, end_date, room_temperature, heating_limit)
+        
+        # Group cities by the first day that needs to be (re)computed
+        groups: Dict[str, List[CityData]] = {}
+        for city in cities:
+            state = self.rolling_states.get(city.name)
+            if (state is None or state.last_date is None
+                    or (state.season_start, state.room_temperature, state.heating_limit)
+                    != (season_start, room_temperature, heating_limit)):
+                state = RollingState(city.name, season_start, room_temperature, heating_limit)
+                self.rolling_states[city.name] = state
+                recompute_from = season_start
+            else:
+                window_start = datetime.strptime(state.last_date, '%Y-%m-%d') - timedelta(days=revision_days - 1)
+                recompute_from = max(season_start, window_start.strftime('%Y-%m-%d'))
+            groups.setdefault(recompute_from, []).append(city)
         
         results = {}
+        for recompute_from, group in groups.items():
+            if recompute_from > end_date:
+                continue
+            self.logger.info(f"Rolling update of {len(group)} cities from {recompute_from}")
+            series_list = self._fetch_series_for_cities(
+                group, recompute_from, end_date, max_workers, batch_size)
+            for city, series in zip(group, series_list):
+                if series is None:
+                    continue
+                state = self.rolling_states[city.name]
+                self._apply_rolling_update(state, recompute_from, series, revision_days)
         
         for city in cities:
+            state = self.rolling_states[city.name]
+            if state.last_date is None:
+                continue
+            results[city.name] = CalculationResult(
+                city_name=city.name,
+                gradtagszahl=state.gradtagszahl,
+                heating_days_count=state.heating_days_count,
+                period_start=state.season_start,
+                period_end=state.last_date,
+                room_temperature=room_temperature,
+                heating_limit=heating_limit)
+        
+        self.logger.info(f"Rolling update completed for {len(results)}/{len(cities)} cities")
+        return results
+    
+    def save_rolling_states(self, path: str) -> None:
+        """
+        Save the rolling states to a JSON file
+        
+        Args:
+            path: Target file path
+        """
+        states = {name: asdict(state) for name, state in self.rolling_states.items()}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(states, f, indent=2)
+        os.replace(tmp_path, path)
+    
+    def load_rolling_states(self, path: str) -> None:
+        """
+        Load rolling states saved by save_rolling_states, if the file exists
+        
+        Args:
+            path: Source file path
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            states = json.load(f)
+        self.rolling_states = {name: RollingState(**state) for name, state in states.items()}
+    
+    @protected
+    def _apply_rolling_update(
+        self,
+        state: RollingState,
+        recompute_from: str,
+        series: TemperatureSeries,
+        revision_days: int
+        ) -> None:
+        """Replace the days from recompute_from on with a freshly fetched series"""
+        dates = series.valid_dates()
+        temperatures = series.valid_values()
+        
+        # Take back the days that were fetched again
+        revised = [
+            temp for day, temp in state.recent_temperatures.items() if day >= recompute_from]
+        if revised:
+            total, heating_days, _ = self._calculate_heating_degree_days(
+                revised, state.room_temperature, state.heating_limit)
+            state.gradtagszahl -= total
+            state.heating_days_count -= heating_days
+        
+        total, heating_days, _ = self._calculate_heating_degree_days(
+            temperatures, state.room_temperature, state.heating_limit)
+        state.gradtagszahl += total
+        state.heating_days_count += heating_days
+        state.last_date = dates[-1]
+        
+        # Keep only the trailing window for the next update
+        window_start = (datetime.strptime(state.last_date, '%Y-%m-%d')
+                        - timedelta(days=revision_days - 1)).strftime('%Y-%m-%d')
+        recent = {
+            day: temp for day, temp in state.recent_temperatures.items() if day < recompute_from}
+        recent.update(zip(dates, temperatures))
+        state.recent_temperatures = {
+            day: temp for day, temp in sorted(recent.items()) if day >= window_start}
+    
+    @protected
+    def _fetch_series_for_cities(
+        self,
+        cities: List[CityData],
+        start_date: str,
+        end_date: str,
+        max_workers: int,
+        batch_size: int,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+        ) -> List[Optional[TemperatureSeries]]:
+        """
+        Fetch the series of all cities, in batches and concurrently if requested
+        
+        Returns:
+            List of TemperatureSeries in city order, None for failed cities
+        """
+        series_list = [None] * len(cities)
+        finished = 0
+        for index, series in self._iter_series_for_cities(
+                cities, start_date, end_date, max_workers, batch_size, cancel_event):
+            series_list[index] = series
+            finished += 1
+            if progress_callback is not None:
+                progress_callback(finished, len(cities))
+        return series_list
+    
+    @protected
+    def _iter_series_for_cities(
+        self,
+        cities: List[CityData],
+        start_date: str,
+        end_date: str,
+        max_workers: int,
+        batch_size: int,
+        cancel_event: Optional[threading.Event] = None
+        ) -> Iterator[Tuple[int, Optional[TemperatureSeries]]]:
+        """
+        Fetch the series of all cities, yielding them as they arrive
+        
+        Cities are grouped by archive grid cell first; one series is
+        fetched per cell and handed to every city of the cell. batch_size
+        counts cells.
+        
+        Yields:
+            Tuple of (city index, TemperatureSeries or None for failed cities)
+        """
+        self.location_index = LocationIndex(cities, self.coalescer.grid_resolution)
+        self.logger.info(self.location_index.summary())
+        groups = self.location_index.groups
+        cells = self.location_index.representatives()
+        
+        chunk_size = max(1, batch_size)
+        chunks = [
+            (start, cells[start:start + chunk_size])
+            for start in range(0, len(cells), chunk_size)]
+        fetch_chunk = partial(
+            self._fetch_chunk, start_date=start_date, end_date=end_date, cancel_event=cancel_event)
+        
+        if max_workers > 1 and len(chunks) > 1:
+            # Fetch concurrently, the index keeps results in city order
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                futures = {executor.submit(fetch_chunk, chunk): start for start, chunk in chunks}
+                for future in as_completed(futures):
+                    for offset, series in enumerate(future.result()):
+                        for index in groups[futures[future] + offset]:
+                            yield index, series
+        else:
+            for start, chunk in chunks:
+                for offset, series in enumerate(fetch_chunk(chunk)):
+                    for index in groups[start + offset]:
+                        yield index, series
+    
+    # Not @protected: accessify rejects calls coming from executor worker threads
+    def _fetch_chunk(
+        self,
+        cities: List[CityData],
+        start_date: str,
+        end_date: str,
+        cancel_event: Optional[threading.Event] = None
+        ) -> List[Optional[TemperatureSeries]]:
+        """
+        Fetch a chunk of cities with one batch request, falling back to
+        single requests for the cities the batch could not deliver
+        
+        Returns:
+            List of TemperatureSeries in chunk order, None for failed cities
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            return [None] * len(cities)
+        
+        series_list = [None] * len(cities)
+        if len(cities) > 1:
             try:
-                self.logger.info(f"Processing city: {city.name}")
-                
-                # Get temperature data for the city
-                temperature_data = self._fetch_temperature_data(
-                    city, start_date, end_date)
-                
-                # Calculate heating degree days
-                gradtagszahl, heating_days = self._calculate_heating_degree_days(
-                    temperature_data, room_temperature, heating_limit)
+                series_list = self._fetch_temperature_data_batch(cities, start_date, end_date)
+            except Exception as e:
+                self.logger.warning(
+                    f"Batch request for {len(cities)} cities failed, "
+                    f"falling back to single requests: {e}")
+        
+        for index, city in enumerate(cities):
+            if series_list[index] is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                series_list[index] = self._fetch_city(city, start_date, end_date)
+        return series_list
+    
+    @protected
+    def _fetch_city(
+        self,
+        city: CityData,
+        start_date: str,
+        end_date: str
+        ) -> Optional[TemperatureSeries]:
+        """
+        Fetch a single city, isolating its errors
+        
+        Returns:
+            TemperatureSeries, or None if the city failed
+        """
+        try:
+            self.logger.info(f"Processing city: {city.name}")
+            return self._fetch_temperature_data(city, start_date, end_date)
+        except Exception as e:
+            self.logger.error(f"Error processing {city.name}: {e}")
+            # Continue with other cities, don't fail completely
+            return None
+    
+    @protected
+    def _calculate_results(
+        self,
+        cities: List[CityData],
+        series_list: List[Optional[TemperatureSeries]],
+        start_date: str,
+        end_date: str,
+        parameter_sets: List[Tuple[float, float]],
+        metrics: Sequence[str] = ('gradtagszahl',),
+        cooling_base: float = DEFAULT_COOLING_BASE
+        ) -> Dict[Tuple[float, float], Dict[str, CalculationResult]]:
+        """
+        Calculate all parameter sets and metrics for all fetched cities in
+        one vectorized pass
+        
+        Returns:
+            Dictionary with parameter sets as keys and dictionaries of
+            city names and CalculationResult as values
+        """
+        fetched = [
+            (city, series) for city, series in zip(cities, series_list) if series is not None]
+        results = {parameter_set: {} for parameter_set in parameter_sets}
+        if not fetched:
+            return results
+        
+        # Locations × days matrix over the full period, NaN for missing days;
+        # the series may cover a longer range and are sliced without copying
+        fetched = [(city, series.slice(start_date, end_date)) for city, series in fetched]
+        temperatures = np.vstack([series.values for _, series in fetched])
+        
+        with tracer.span('degree_days', city=', '.join(city.name for city, _ in fetched)):
+            degree_days = calculate_degree_days(
+                temperatures, parameter_sets, metrics, start_date, cooling_base)
+        
+        for set_index, (room_temperature, heating_limit) in enumerate(parameter_sets):
+            for row, (city, series) in enumerate(fetched):
+                gradtagszahl = float(degree_days.totals[set_index, row])
+                heating_days = int(degree_days.heating_days[set_index, row])
                 
                 # Create result object
-                result = CalculationResult(
+                results[(room_temperature, heating_limit)][city.name] = CalculationResult(
                     city_name=city.name,
                     gradtagszahl=gradtagszahl,
                     heating_days_count=heating_days,
                     period_start=start_date,
                     period_end=end_date,
                     room_temperature=room_temperature,
-                    heating_limit=heating_limit)
-                
-                results[city.name] = result
+                    heating_limit=heating_limit,
+                    series=series,
+                    daily_values=np.where(
+                        series.valid_mask, degree_days.daily_values[set_index, row], np.nan),
+                    **self._metric_fields(degree_days, set_index, row))
                 
                 self.logger.info(
                     f"{city.name}: {gradtagszahl:.1f}, "
                     f"({heating_days} heating days)"
                 )
-                
-            except Exception as e:
-                self.logger.error(f"Error processing {city.name}: {e}")
-                # Continue with other cities, don't fail completely
-                continue
-                
-        self.logger.info(f"Calculation completed for {len(results)}/{len(cities)} cities")
         return results
     
+    @protected
+    def _metric_fields(
+        self,
+        degree_days: DegreeDayResult,
+        set_index: int,
+        row: int
+        ) -> Dict[str, Any]:
+        """CalculationResult fields of the further metrics of one parameter set and city"""
+        fields = {}
+        if degree_days.heating_degree_days is not None:
+            fields['heating_degree_days'] = float(degree_days.heating_degree_days[set_index, row])
+        if degree_days.cooling_degree_days is not None:
+            fields['cooling_degree_days'] = float(degree_days.cooling_degree_days[row])
+            fields['cooling_days_count'] = int(degree_days.cooling_days[row])
+        if degree_days.months is not None:
+            means = degree_days.monthly_mean_temperatures[row]
+            fields['monthly'] = [
+                MonthlyValues(
+                    month=str(month),
+                    gradtagszahl=float(degree_days.monthly_totals[set_index, row, index]),
+                    heating_days_count=int(degree_days.monthly_heating_days[set_index, row, index]),
+                    heating_degree_days=float(degree_days.monthly_heating_degree_days[set_index, row, index]),
+                    mean_temperature=None if np.isnan(means[index]) else float(means[index]),
+                    valid_days=int(degree_days.monthly_valid_days[row, index]))
+                for index, month in enumerate(degree_days.months)]
+        return fields
+    
+    @protected
+    def _validate_metrics(self, metrics: Sequence[str]) -> None:
+        """Reject unknown metrics before anything is fetched"""
+        unknown = set(metrics) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+    
     @protected
     def _validate_inputs(
         self,
@@ -151,9 +905,10 @@ class GradtagszahlenCalculator:
         city: CityData,
         start_date: str,
         end_date: str
-        ) -> List[float]:
+        ) -> TemperatureSeries:
         """
-        Fetch daily mean temperature data from Open-Meteo API
+        Fetch daily mean temperature data from Open-Meteo API,
+        only requesting days that are missing from the cache
         
         Args:
             city: CityData object with coordinates
@@ -161,69 +916,195 @@ class GradtagszahlenCalculator:
             end_date: End date string
             
         Returns:
-            List of daily mean temperatures in Celsius
+            TemperatureSeries of daily mean temperatures in Celsius
+            covering the whole period, NaN for days without data
         """
-
-        params = {
-            'latitude': city.latitude,
-            'longitude': city.longitude,
-            'start_date': start_date,
-            'end_date': end_date,
-            'daily': 'temperature_2m_mean',
-            'timezone': 'auto'}
-        
         try:
-            response = self.crud_handler.get('archive', params)
+            daily_values, missing_ranges = self._lookup_cache(city, start_date, end_date)
             
-            # Extract temperature data
-            if 'daily' not in response or 'temperature_2m_mean' not in response['daily']:
-                raise ValueError(f"Invalid API response for {city.name}")
-                
-            temperatures = response['daily']['temperature_2m_mean']
+            # Only request the days that are not cached yet
+            for range_start, range_end in missing_ranges:
+                dates, values = self._request_daily_series(
+                    [city], range_start, range_end)[0]
+                self._merge_daily_values(city, daily_values, start_date, dates, values)
             
-            # Filter out None values
-            valid_temperatures = [temp for temp in temperatures if temp is not None]
-            
-            if not valid_temperatures:
-                raise ValueError(f"No valid temperature data for {city.name}")
-                
-            self.logger.debug(f"Fetched {len(valid_temperatures)} temperature values for {city.name}")
-            return valid_temperatures
+            return self._build_series(city, daily_values, start_date, end_date)
             
         except Exception as e:
             raise Exception(f"Failed to fetch temperature data for {city.name}: {e}")
     
+    @protected
+    def _fetch_temperature_data_batch(
+        self,
+        cities: List[CityData],
+        start_date: str,
+        end_date: str
+        ) -> List[Optional[TemperatureSeries]]:
+        """
+        Fetch daily mean temperature data for several cities with one
+        multi-coordinate request covering all days missing from the cache
+        
+        Args:
+            cities: List of CityData objects
+            start_date: Start date string
+            end_date: End date string
+            
+        Returns:
+            List of TemperatureSeries per city, None for cities
+            without valid data
+        """
+        lookups = []
+        pending = []
+        for city in cities:
+            daily_values, missing_ranges = self._lookup_cache(city, start_date, end_date)
+            lookups.append(daily_values)
+            if missing_ranges:
+                pending.append((city, daily_values, missing_ranges))
+        
+        if pending:
+            # One request spanning the missing days of all cities in the batch
+            range_start = min(ranges[0][0] for _, _, ranges in pending)
+            range_end = max(ranges[-1][1] for _, _, ranges in pending)
+            pending_cities = [city for city, _, _ in pending]
+            series = self._request_daily_series(pending_cities, range_start, range_end)
+            for (city, daily_values, _), (dates, values) in zip(pending, series):
+                self._merge_daily_values(city, daily_values, start_date, dates, values)
+        
+        results = []
+        for city, daily_values in zip(cities, lookups):
+            try:
+                results.append(self._build_series(city, daily_values, start_date, end_date))
+            except ValueError as e:
+                self.logger.warning(str(e))
+                results.append(None)
+        return results
+    
+    @protected
+    def _lookup_cache(
+        self,
+        city: CityData,
+        start_date: str,
+        end_date: str
+        ) -> Tuple[np.ndarray, List[Tuple[str, str]]]:
+        """Cached values of every day of the period (NaN if not cached) and missing (start, end) ranges of a city"""
+        if self.cache is None:
+            return np.full(len(period_days(start_date, end_date)), np.nan), [(start_date, end_date)]
+        latitude, longitude = self._cache_cell(city)
+        return self.cache.lookup_values(latitude, longitude, self.source.cache_variable, start_date, end_date)
+    
+    @protected
+    def _merge_daily_values(
+        self,
+        city: CityData,
+        daily_values: np.ndarray,
+        start_date: str,
+        dates: np.ndarray,
+        values: np.ndarray
+        ) -> None:
+        """Add fetched values to the period array daily_values and write them to the cache"""
+        offsets = (dates - np.datetime64(start_date, 'D')).astype(np.int64)
+        inside = (offsets >= 0) & (offsets < len(daily_values)) & ~np.isnan(values)
+        daily_values[offsets[inside]] = values[inside]
+        if self.cache is not None:
+            latitude, longitude = self._cache_cell(city)
+            self.cache.store_values(latitude, longitude, self.source.cache_variable, dates, values)
+    
+    @protected
+    def _cache_cell(self, city: CityData) -> Cell:
+        """
+        Cache key of a city: the cell its requests are grouped by, so cities
+        share cached series exactly when they share requests
+        """
+        return self.coalescer.cell_of(city.latitude, city.longitude)
+    
+    @protected
+    def _build_series(
+        self,
+        city: CityData,
+        daily_values: np.ndarray,
+        start_date: str,
+        end_date: str
+        ) -> TemperatureSeries:
+        """Series of a period on a contiguous date index, NaN for days without data"""
+        with tracer.span('validation', city=city.name):
+            series = TemperatureSeries(start_date, daily_values)
+        
+        if not series.valid_count:
+            raise ValueError(f"No valid temperature data for {city.name}")
+            
+        self.logger.debug(f"Fetched {series.valid_count} temperature values for {city.name}")
+        return series
+    
+    @protected
+    def _request_daily_series(
+        self,
+        cities: List[CityData],
+        start_date: str,
+        end_date: str
+        ) -> List[DailySeries]:
+        """
+        Request daily series of several cities, sharing the request of
+        cities in the same grid cell (also with other threads)
+
+        A shared request asks for the coordinates of the first city of its
+        cell, not for the cell center, so a single city always gets the
+        series of its own location.
+        
+        Args:
+            cities: List of CityData objects
+            start_date: Start date string
+            end_date: End date string
+            
+        Returns:
+            List of (datetime64[D] dates, float64 values with NaN for gaps) per city
+        """
+        cells = [self.coalescer.cell_of(city.latitude, city.longitude) for city in cities]
+        points: Dict[Cell, Cell] = {}
+        for cell, city in zip(cells, cities):
+            points.setdefault(cell, (round(city.latitude, 4), round(city.longitude, 4)))
+        # Spans of the HTTP layer are tagged with the requested cities
+        with tracer.tags(city=', '.join(city.name for city in cities)):
+            return self.coalescer.fetch(
+                cells, start_date, end_date,
+                partial(self._request_cells, points=points, start_date=start_date, end_date=end_date))
+    
+    # Not @protected: called back from the RequestCoalescer
+    def _request_cells(
+        self,
+        cells: List[Cell],
+        points: Dict[Cell, Cell],
+        start_date: str,
+        end_date: str
+        ) -> List[DailySeries]:
+        """Daily series of distinct grid cells, requested at a location of each cell"""
+        return self.source.fetch([points[cell] for cell in cells], start_date, end_date)
+    
     @protected
     def _calculate_heating_degree_days(
         self,
-        temperatures: List[float],
+        temperatures: Union[List[float], np.ndarray],
         room_temperature: float,
         heating_limit: float
-        ) -> Tuple[float, int]:
+        ) -> Tuple[float, int, List[float]]:
         """
         Calculate heating degree days from temperature data
         
         Args:
-            temperatures: List of daily mean temperatures
+            temperatures: Daily mean temperatures, NaN for missing days
             room_temperature: Target indoor temperature
             heating_limit: Temperature below which heating is needed
             
         Returns:
-            Tuple of (total_gradtagszahl, number_of_heating_days)
-        """
-        total_gradtagszahl = 0.0
-        heating_days = 0
-        
-        for temp in temperatures:
-            # Check if it's a heating day
-            if temp < heating_limit:
-                # Calculate heating degree day value
-                daily_gradtag = room_temperature - temp
-                total_gradtagszahl += daily_gradtag
-                heating_days += 1
+            Tuple of (total_gradtagszahl, number_of_heating_days, daily_values)
+        """
+        degree_days = calculate_degree_days(
+            np.asarray(temperatures, dtype=np.float64), [(room_temperature, heating_limit)])
+        total_gradtagszahl = float(degree_days.totals[0, 0])
+        heating_days = int(degree_days.heating_days[0, 0])
+        daily_values = degree_days.daily_values[0, 0].tolist()
                 
         self.logger.debug(f"Calculated {total_gradtagszahl:.1f} Kd from {heating_days} heating days")
-        return total_gradtagszahl, heating_days
+        return total_gradtagszahl, heating_days, daily_values
     
     def get_calculation_summary(self, results: Dict[str, CalculationResult]) -> str:
         """
@@ -267,7 +1148,7 @@ class GradtagszahlenCalculator:
         Public method to fetch daily mean temperature data for a city and period.
         Returns a list of daily mean temperatures in Celsius.
         """
-        return self._fetch_temperature_data(city, start_date, end_date)
+        return self._fetch_temperature_data(city, start_date, end_date).valid_values()
 
 
 # Example usage and testing
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional
+
+from Library.requestCoalescer import Cell, DEFAULT_GRID_RESOLUTION, snap_to_grid
+
+
+class LocationIndex:
+    """
+    Grid hash mapping locations to the grid cells they fall into
+
+    Only one series per cell is fetched and fanned out to every location
+    of the cell. The archive downscales to the requested point, so this is
+    exact only for identical coordinates (grid_resolution None); with a
+    coarser grid all locations of a cell get the series of the first one.
+    """
+
+    def __init__(self, cities: List, grid_resolution: Optional[float] = DEFAULT_GRID_RESOLUTION):
+        """
+        Build the index
+
+        Args:
+            cities: CityData objects (anything with name, latitude and longitude)
+            grid_resolution: Grid spacing in degrees, None only groups
+                identical coordinates
+        """
+        self.cities = cities
+        self.grid_resolution = grid_resolution
+        # Insertion ordered, cells appear in the order of their first location
+        self._cells: Dict[Cell, List[int]] = {}
+        for index, city in enumerate(cities):
+            self._cells.setdefault(self.cell_of(city.latitude, city.longitude), []).append(index)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def cell_of(self, latitude: float, longitude: float) -> Cell:
+        """Grid cell of a location"""
+        return snap_to_grid(latitude, longitude, self.grid_resolution)
+
+    @property
+    def cells(self) -> List[Cell]:
+        """Distinct cells in order of their first location"""
+        return list(self._cells)
+
+    @property
+    def groups(self) -> List[List[int]]:
+        """Location indices per cell, aligned with cells"""
+        return list(self._cells.values())
+
+    def sites(self, cell: Cell) -> List[int]:
+        """Indices of the locations in a cell"""
+        return self._cells.get(cell, [])
+
+    def representatives(self) -> List:
+        """
+        One location per cell (same class as the indexed locations): the
+        first location of the cell, at its own coordinates
+
+        Returns:
+            Locations aligned with cells
+        """
+        representatives = []
+        for sites in self._cells.values():
+            first = self.cities[sites[0]]
+            name = first.name if len(sites) == 1 else f"{first.name} (+{len(sites) - 1})"
+            representatives.append(type(first)(name, first.latitude, first.longitude))
+        return representatives
+
+    @property
+    def saved_requests(self) -> int:
+        """Number of location series that do not need an own request"""
+        return len(self.cities) - len(self._cells)
+
+    def summary(self) -> str:
+        """Short description for logs and status bars"""
+        return (
+            f"{len(self.cities)} locations in {len(self._cells)} grid cells, "
+            f"{self.saved_requests} requests saved")
@@ -0,0 +1,76 @@
+import logging
+import tempfile
+from typing import Optional
+
+from PyQt5.QtCore import QUrl
+from PyQt5.QtWidgets import QVBoxLayout, QWidget
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+
+# Leaflet page showing a single marker
+LEAFLET_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset='utf-8'/>
+    <meta name='viewport' content='width=device-width, initial-scale=1.0'>
+    <title>Karte</title>
+    <link rel='stylesheet' href='https://unpkg.com/leaflet@1.9.4/dist/leaflet.css'/>
+    <style> #map {{ height: 100vh; width: 100vw; margin:0; }} html, body {{ height:100%; margin:0; }} </style>
+</head>
+<body>
+    <div id='map'></div>
+    <script src='https://unpkg.com/leaflet@1.9.4/dist/leaflet.js'></script>
+    <script>
+        var map = L.map('map').setView([{lat}, {lon}], 13);
+        L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
+            maxZoom: 19,
+            attribution: '© OpenStreetMap contributors'
+        }}).addTo(map);
+        var marker = L.marker([{lat}, {lon}]).addTo(map)
+            .bindPopup('<b>Ausgewählter Standort</b><br>{address}')
+            .openPopup();
+    </script>
+</body>
+</html>
+"""
+
+
+class MapView(QWidget):
+    """
+    Web view showing a location on an OpenStreetMap map
+
+    Lives in its own module so the web engine is only imported when a map
+    is actually opened.
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        """
+        Initialize the map view
+
+        Args:
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.web_view = QWebEngineView()
+        layout.addWidget(self.web_view)
+
+    def show_location(self, lat: float, lon: float, address: str = "") -> None:
+        """
+        Center the map on a location and mark it
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            address: Text of the marker popup
+        """
+        try:
+            page = LEAFLET_PAGE_TEMPLATE.format(lat=lat, lon=lon, address=address.replace("'", "&#39;"))
+            page_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
+            page_file.write(page)
+            page_file.close()
+            self.web_view.load(QUrl.fromLocalFile(page_file.name))
+        except Exception as e:
+            self.logger.error(f"Map creation error: {e}")
+            self.web_view.setHtml(f"<h3>Karte konnte nicht geladen werden: {e}</h3>")
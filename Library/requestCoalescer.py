@@ -0,0 +1,138 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Cell = Tuple[float, float]
+
+# Resolution of the ERA5-Land grid behind the archive API in degrees
+ARCHIVE_GRID_RESOLUTION = 0.1
+
+# Only identical coordinates share a request by default: the archive
+# downscales to the requested point with a 90 m elevation model, so points
+# of one grid cell do not get the same series
+DEFAULT_GRID_RESOLUTION: Optional[float] = None
+
+
+def snap_to_grid(latitude: float, longitude: float, resolution: Optional[float]) -> Cell:
+    """
+    Center of the grid cell containing a point
+
+    Args:
+        latitude: Latitude of the point
+        longitude: Longitude of the point
+        resolution: Grid spacing in degrees, None keeps the point (rounded
+            to 4 decimals, about 10 m)
+
+    Returns:
+        (latitude, longitude) of the cell
+    """
+    if not resolution:
+        return round(latitude, 4), round(longitude, 4)
+    return (
+        round(round(latitude / resolution) * resolution, 4),
+        round(round(longitude / resolution) * resolution, 4))
+
+
+class RequestCoalescer:
+    """
+    Shares archive requests between callers that want the same grid cell
+    and period
+
+    Locations are normalized to about 10 m, so repeated addresses become
+    the same request. With a grid_resolution such as ARCHIVE_GRID_RESOLUTION
+    all locations of a grid cell share one request as well; they then get
+    the series of one of them, which changes the results of the others.
+    Within one call every cell is requested once; across threads a cell
+    that is already being fetched is not requested again, the caller waits
+    for the running request instead.
+    """
+
+    def __init__(self, grid_resolution: Optional[float] = DEFAULT_GRID_RESOLUTION):
+        """
+        Initialize the coalescer
+
+        Args:
+            grid_resolution: Grid spacing in degrees used to normalize
+                coordinates, None only merges identical coordinates
+                (opt in with ARCHIVE_GRID_RESOLUTION)
+        """
+        self.grid_resolution = grid_resolution
+        self.requested = 0
+        self.fetched = 0
+        self.logger = logging.getLogger(__name__)
+        self._in_flight: Dict[Tuple[Cell, str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def cell_of(self, latitude: float, longitude: float) -> Cell:
+        """Grid cell of a location"""
+        return snap_to_grid(latitude, longitude, self.grid_resolution)
+
+    def fetch(
+        self,
+        cells: List[Cell],
+        start_date: str,
+        end_date: str,
+        fetch_cells: Callable[[List[Cell]], List[Any]]
+        ) -> List[Any]:
+        """
+        Fetch a period for several cells, requesting each cell at most once
+
+        Args:
+            cells: Cells as returned by cell_of(), duplicates allowed
+            start_date: Start date in format 'YYYY-MM-DD'
+            end_date: End date in format 'YYYY-MM-DD'
+            fetch_cells: Requests distinct cells and returns one result per cell
+
+        Returns:
+            Results in the order of cells; duplicate cells share a result
+
+        Raises:
+            Exception: Whatever fetch_cells raised, also for callers that
+                waited for a shared request
+        """
+        owned: Dict[Cell, Future] = {}
+        futures: Dict[Cell, Future] = {}
+        with self._lock:
+            self.requested += len(cells)
+            for cell in cells:
+                if cell in futures:
+                    continue
+                key = (cell, start_date, end_date)
+                if key not in self._in_flight:
+                    self._in_flight[key] = owned[cell] = Future()
+                futures[cell] = self._in_flight[key]
+            self.fetched += len(owned)
+
+        # Fetch our own cells before waiting for others, so no two callers wait on each other
+        if owned:
+            try:
+                results = fetch_cells(list(owned))
+                if len(results) != len(owned):
+                    raise ValueError(f"Expected {len(owned)} results, got {len(results)}")
+                for future, result in zip(owned.values(), results):
+                    future.set_result(result)
+            except Exception as e:
+                for future in owned.values():
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                with self._lock:
+                    for cell in owned:
+                        self._in_flight.pop((cell, start_date, end_date), None)
+
+        shared = len(cells) - len(owned)
+        if shared:
+            self.logger.debug(f"{shared} of {len(cells)} locations served by shared requests")
+        return [futures[cell].result() for cell in cells]
+
+    @property
+    def saved(self) -> int:
+        """Number of location requests answered without an own request"""
+        return self.requested - self.fetched
+
+    def reset_stats(self) -> None:
+        """Reset the request counters"""
+        with self._lock:
+            self.requested = 0
+            self.fetched = 0
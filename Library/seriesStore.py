@@ -0,0 +1,443 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Day offsets in the index count from this date, the start of the ERA5 archive
+EPOCH = np.datetime64('1940-01-01', 'D')
+
+FORMAT_MAGIC = b'GTZ1'
+
+# Header of both files; the generation ties an index to its data file
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('epoch', '<i4'),           # EPOCH in days since 1970-01-01
+    ('generation', '<u8')])
+
+# One record per written block; later records of the same cell replace earlier ones
+INDEX_DTYPE = np.dtype([
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('first_day', '<i4'),       # Day of the first value as offset from EPOCH
+    ('length', '<i4'),          # Number of days covered
+    ('capacity', '<i4'),        # Reserved values, the block can grow in place up to this
+    ('offset', '<i8')])         # Position of the first value in the data file (in values)
+
+VALUE_DTYPE = np.dtype('<f4')
+
+# The archive delivers 0.1 °C; rounding on reading undoes the float32 representation error
+DECIMALS = 2
+
+# Reserved days at the end of a new block, so appending recent days does not move it
+GROWTH_DAYS = 366
+
+# Index entry: (first_day, length, capacity, offset)
+Entry = Tuple[int, int, int, int]
+
+
+def missing_ranges(start_date: str, values: np.ndarray) -> List[Tuple[str, str]]:
+    """
+    (start, end) date ranges of the NaN runs in a daily series
+
+    Args:
+        start_date: Date of the first value in format 'YYYY-MM-DD'
+        values: Daily values, NaN for missing days
+
+    Returns:
+        List of (start, end) date strings, both ends inclusive
+    """
+    edges = np.diff(np.concatenate(([False], np.isnan(values), [False])).astype(np.int8))
+    first = np.datetime64(start_date, 'D')
+    return [
+        (str(first + start), str(first + end - 1))
+        for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))]
+
+
+@contextmanager
+def _exclusive_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on a lock file, across processes"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass    # LK_LOCK gives up after 10 seconds
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _SeriesTable:
+    """Files of one variable: a float32 data file and an append-only index"""
+
+    def __init__(self, data_path: str, index_path: str, lock_path: str, logger: logging.Logger):
+        self.data_path = data_path
+        self.index_path = index_path
+        self.lock_path = lock_path
+        self.logger = logger
+        self.entries: Dict[Tuple[float, float], Entry] = {}
+        self.generation: Optional[int] = None
+        self.size = 0           # Values in the data file
+        self._index_size = 0    # Bytes of the index read so far, up to the last whole record
+        self._data: Optional[np.memmap] = None
+        with self.locked():
+            pass
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Lock the files against other processes and catch up with their writes
+
+        Every access runs under this lock, so offsets and index records are
+        always based on the files as they are on disk, not on this process'
+        view of them.
+        """
+        with _exclusive_lock(self.lock_path):
+            self._refresh()
+            yield
+
+    def _refresh(self) -> None:
+        """Apply index records appended by other processes, reload after they compacted"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)
+                if len(header) != 1 or int(header[0]['generation']) != self.generation:
+                    self._load()
+                    return
+                f.seek(self._index_size)
+                raw = f.read()
+        except FileNotFoundError:
+            self._load()
+            return
+        self.size = (os.path.getsize(self.data_path) - HEADER_DTYPE.itemsize) // VALUE_DTYPE.itemsize
+        count = len(raw) // INDEX_DTYPE.itemsize
+        if count:
+            records = np.frombuffer(raw[:count * INDEX_DTYPE.itemsize], dtype=INDEX_DTYPE)
+            self.entries.update(
+                ((latitude, longitude), (first_day, length, capacity, offset))
+                for latitude, longitude, first_day, length, capacity, offset in records.tolist()
+                if offset + capacity <= self.size)
+            self._index_size += count * INDEX_DTYPE.itemsize
+
+    def _load(self) -> None:
+        """Read the index, creating empty files if there are none or they do not match"""
+        self._data = None
+        try:
+            raw = np.fromfile(self.index_path, dtype=np.uint8)
+            header = raw[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+            with open(self.data_path, 'rb') as f:
+                data_header = np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)
+            if (len(header) != 1 or len(data_header) != 1 or header[0] != data_header[0]
+                    or header[0]['magic'] != FORMAT_MAGIC):
+                raise ValueError("index and data file do not match")
+        except FileNotFoundError:
+            self._create()
+            return
+        except (ValueError, OSError) as e:
+            self.logger.warning(f"Resetting unreadable series store {self.data_path}: {e}")
+            self._create()
+            return
+
+        # A record torn by an interrupted write is dropped
+        count = (len(raw) - HEADER_DTYPE.itemsize) // INDEX_DTYPE.itemsize
+        records = raw[HEADER_DTYPE.itemsize:HEADER_DTYPE.itemsize + count * INDEX_DTYPE.itemsize]
+        records = records.view(INDEX_DTYPE)
+        self._index_size = HEADER_DTYPE.itemsize + count * INDEX_DTYPE.itemsize
+        self.generation = int(header[0]['generation'])
+        self.size = (os.path.getsize(self.data_path) - HEADER_DTYPE.itemsize) // VALUE_DTYPE.itemsize
+        self.entries = {
+            (latitude, longitude): (first_day, length, capacity, offset)
+            for latitude, longitude, first_day, length, capacity, offset in records.tolist()
+            if offset + capacity <= self.size}
+
+        if self.dead_values > max(self.live_values, 1 << 20):
+            self.compact()
+
+    def _create(self) -> None:
+        """Start empty files with a new generation"""
+        self.generation = int.from_bytes(os.urandom(8), 'little')
+        self.entries = {}
+        self.size = 0
+        self._write_files(np.empty(0, dtype=VALUE_DTYPE), np.empty(0, dtype=INDEX_DTYPE))
+
+    def _write_files(self, values: np.ndarray, records: np.ndarray) -> None:
+        """Replace both files, data first, so an index never points into a foreign data file"""
+        header = np.array([(FORMAT_MAGIC, int(EPOCH.astype(np.int64)), self.generation)], dtype=HEADER_DTYPE)
+        self._data = None
+        for path, body in ((self.data_path, values), (self.index_path, records)):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(header.tobytes())
+                f.write(body.tobytes())
+            os.replace(tmp_path, path)
+        self._index_size = HEADER_DTYPE.itemsize + records.nbytes
+
+    @property
+    def live_values(self) -> int:
+        return sum(capacity for _, _, capacity, _ in self.entries.values())
+
+    @property
+    def dead_values(self) -> int:
+        return self.size - self.live_values
+
+    def data(self) -> np.memmap:
+        """Read-only mapping of the data file, remapped after it grew"""
+        if self._data is None or len(self._data) < self.size:
+            self._data = np.memmap(
+                self.data_path, dtype=VALUE_DTYPE, mode='r',
+                offset=HEADER_DTYPE.itemsize, shape=(self.size,))
+        return self._data
+
+    def read(self, key: Tuple[float, float], first_day: int, days: int) -> np.ndarray:
+        """float64 values of days starting at first_day, NaN where nothing is stored"""
+        values = np.full(days, np.nan)
+        entry = self.entries.get(key)
+        if entry is None or not self.size:
+            return values
+        block_first, length, _, offset = entry
+        lower = max(first_day, block_first)
+        upper = min(first_day + days, block_first + length)
+        if lower < upper:
+            block = self.data()[offset + lower - block_first:offset + upper - block_first]
+            values[lower - first_day:upper - first_day] = np.round(block.astype(np.float64), DECIMALS)
+        return values
+
+    def write(self, key: Tuple[float, float], day_offsets: np.ndarray, values: np.ndarray) -> None:
+        """Store values at day offsets from EPOCH, in place if the block has room; call under locked()"""
+        first, last = int(day_offsets.min()), int(day_offsets.max())
+        entry = self.entries.get(key)
+        if entry is not None:
+            block_first, length, capacity, offset = entry
+            if first >= block_first and last < block_first + capacity:
+                # Write only the touched span of the existing block
+                span = self.data()[offset + first - block_first:offset + last - block_first + 1].copy()
+                span[day_offsets - first] = values
+                with open(self.data_path, 'r+b') as f:
+                    f.seek(HEADER_DTYPE.itemsize + (offset + first - block_first) * VALUE_DTYPE.itemsize)
+                    f.write(span.tobytes())
+                new_length = max(length, last - block_first + 1)
+                if new_length != length:
+                    self._append_record(key, (block_first, new_length, capacity, offset))
+                return
+            # Move the block to the end of the file with the union of both ranges
+            new_first = min(first, block_first)
+            new_length = max(last, block_first + length - 1) - new_first + 1
+            block = np.full(new_length + GROWTH_DAYS, np.nan, dtype=VALUE_DTYPE)
+            block[block_first - new_first:block_first - new_first + length] = \
+                self.data()[offset:offset + length]
+        else:
+            new_first = first
+            new_length = last - first + 1
+            block = np.full(new_length + GROWTH_DAYS, np.nan, dtype=VALUE_DTYPE)
+        block[day_offsets - new_first] = values
+
+        # The end of the file as it is on disk; a value torn by an interrupted write is overwritten
+        with open(self.data_path, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            offset = (f.tell() - HEADER_DTYPE.itemsize) // VALUE_DTYPE.itemsize
+            f.seek(HEADER_DTYPE.itemsize + offset * VALUE_DTYPE.itemsize)
+            f.write(block.tobytes())
+        self.size = offset + len(block)
+        self._append_record(key, (new_first, new_length, len(block), offset))
+
+    def _append_record(self, key: Tuple[float, float], entry: Entry) -> None:
+        """Append an index record after the data it points to was written"""
+        record = np.array([key + entry], dtype=INDEX_DTYPE)
+        # Behind the last whole record, so a torn record cannot shift the following ones
+        with open(self.index_path, 'r+b') as f:
+            f.seek(self._index_size)
+            f.write(record.tobytes())
+        self._index_size += INDEX_DTYPE.itemsize
+        self.entries[key] = entry
+
+    def compact(self) -> None:
+        """Rewrite both files without the space of moved blocks; call under locked()"""
+        data = self.data() if self.size else np.empty(0, dtype=VALUE_DTYPE)
+        blocks = []
+        records = np.empty(len(self.entries), dtype=INDEX_DTYPE)
+        position = 0
+        for row, (key, (first_day, length, capacity, offset)) in enumerate(self.entries.items()):
+            blocks.append(np.asarray(data[offset:offset + capacity]))
+            records[row] = key + (first_day, length, capacity, position)
+            position += capacity
+        values = np.concatenate(blocks) if blocks else np.empty(0, dtype=VALUE_DTYPE)
+        dead = self.dead_values
+        # Views into the old mapping would keep the file open while it is replaced
+        del blocks, data
+
+        generation = self.generation
+        self.generation = int.from_bytes(os.urandom(8), 'little')
+        try:
+            self._write_files(values, records)
+        except OSError as e:
+            # On Windows a file mapped by another process cannot be replaced
+            self.generation = generation
+            self.logger.warning(f"Could not compact {self.data_path}: {e}")
+            return
+        self.entries = {
+            key: (first_day, length, capacity, offset)
+            for key, (_, _, first_day, length, capacity, offset) in zip(self.entries, records.tolist())}
+        self.size = len(values)
+        self.logger.info(f"Compacted {self.data_path}, {dead * VALUE_DTYPE.itemsize} bytes freed")
+
+
+class SeriesStore:
+    """
+    Compact binary store for daily archive series
+
+    Per variable, one data file holds a float32 block per location (4 bytes
+    per day, NaN for gaps) and a small index file maps locations to the
+    first day (as offset from EPOCH), length and position of their block.
+    The data file is read through numpy.memmap, so opening a store only
+    reads the index and lookups only touch the requested days; the series
+    themselves are never loaded as a whole.
+
+    Blocks reserve room for another year, so new recent days are written in
+    place. Blocks that have to grow otherwise are moved to the end of the
+    file; the space they leave behind is reclaimed by compact(), which also
+    runs on opening once more than half of the file is unused.
+
+    Several processes can share a store directory: every access holds an
+    exclusive lock file per variable and first reads the index records the
+    other processes appended. The store has no size limit; it grows with
+    the number of locations and years stored.
+
+    Offers lookup_values() and store_values() like TemperatureCache and can
+    be passed to the calculator as its cache.
+    """
+
+    def __init__(self, store_dir: str, precision: int = 4, min_age_days: int = 7):
+        """
+        Initialize the store
+
+        Args:
+            store_dir: Directory for the store files (created if missing)
+            precision: Number of decimals coordinates are rounded to; the
+                default of 4 (about 10 m) keeps nearby sites apart, like
+                the TemperatureCache
+            min_age_days: Days younger than this are never stored, because
+                the archive may still revise them
+        """
+        self.store_dir = store_dir
+        self.precision = precision
+        self.min_age_days = min_age_days
+        self.logger = logging.getLogger(__name__)
+        self._tables: Dict[str, _SeriesTable] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def lookup_values(
+        self,
+        latitude: float,
+        longitude: float,
+        variable: str,
+        start_date: str,
+        end_date: str
+        ) -> Tuple[np.ndarray, List[Tuple[str, str]]]:
+        """
+        Look up a period in the store
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            variable: Name of the daily API variable
+            start_date: Start date in format 'YYYY-MM-DD'
+            end_date: End date in format 'YYYY-MM-DD'
+
+        Returns:
+            Tuple of (float64 values of every day of the period with NaN
+            for days not stored, missing (start, end) ranges)
+        """
+        first_day = int((np.datetime64(start_date, 'D') - EPOCH).astype(np.int64))
+        days = int((np.datetime64(end_date, 'D') - np.datetime64(start_date, 'D')).astype(np.int64)) + 1
+        with self._lock:
+            table = self._table(variable)
+            with table.locked():
+                values = table.read(self._key(latitude, longitude), first_day, days)
+        return values, missing_ranges(start_date, values)
+
+    def store_values(
+        self,
+        latitude: float,
+        longitude: float,
+        variable: str,
+        dates: np.ndarray,
+        values: np.ndarray
+        ) -> None:
+        """
+        Store daily values
+
+        Missing values and days younger than min_age_days are skipped.
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            variable: Name of the daily API variable
+            dates: datetime64[D] dates
+            values: float values matching the dates, NaN for missing values
+        """
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        values = np.asarray(values, dtype=np.float64)
+        cutoff = np.datetime64(date.today() - timedelta(days=self.min_age_days), 'D')
+        keep = ~np.isnan(values) & (dates >= EPOCH) & (dates <= cutoff)
+        if not keep.any():
+            return
+        day_offsets = (dates[keep] - EPOCH).astype(np.int64)
+        with self._lock:
+            table = self._table(variable)
+            with table.locked():
+                table.write(self._key(latitude, longitude), day_offsets, values[keep])
+
+    def compact(self) -> None:
+        """Reclaim the space of moved blocks in all opened variables"""
+        with self._lock:
+            for table in self._tables.values():
+                with table.locked():
+                    if table.dead_values:
+                        table.compact()
+
+    def clear(self) -> None:
+        """Remove all stored series"""
+        with self._lock:
+            for table in self._tables.values():
+                with table.locked():
+                    table._create()
+            for name in os.listdir(self.store_dir):
+                if name.endswith(('.f32', '.idx')):
+                    variable = name.rsplit('.', 1)[0]
+                    if variable not in self._tables:
+                        os.remove(os.path.join(self.store_dir, name))
+
+    def _key(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        return round(latitude, self.precision), round(longitude, self.precision)
+
+    def _table(self, variable: str) -> _SeriesTable:
+        """Files of a variable, opened on first use"""
+        table = self._tables.get(variable)
+        if table is None:
+            base = os.path.join(self.store_dir, variable)
+            table = self._tables[variable] = _SeriesTable(
+                f"{base}.f32", f"{base}.idx", f"{base}.lock", self.logger)
+            self.logger.debug(f"Opened series store {base} with {len(table.entries)} locations")
+        return table
@@ -0,0 +1,233 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from Library.degreeDayEngine import calculate_degree_days
+
+# Upper bound of the per-day intermediates of one shard, (parameter sets, locations, days) float64
+SHARD_BYTES = 64 * 1024 * 1024
+
+# Shards per process, more shards balance uneven workers at a small per-task cost
+SHARDS_PER_PROCESS = 4
+
+logger = logging.getLogger(__name__)
+
+# Temperature matrix of a worker process, attached once by the pool initializer
+_worker_state: Dict[str, object] = {}
+
+
+@dataclass
+class SweepResult:
+    """Data class for the totals of a sweep over periods, parameter sets and locations"""
+    names: List[str]
+    periods: List[Tuple[str, str]]
+    parameter_sets: List[Tuple[float, float]]
+    totals: np.ndarray          # (periods, parameter sets, locations)
+    heating_days: np.ndarray    # (periods, parameter sets, locations)
+    valid_days: np.ndarray      # (periods, locations), days with data
+
+    def iter_rows(self) -> Iterator[Tuple[str, Tuple[str, str], Tuple[float, float], float, int]]:
+        """
+        Yield (name, period, parameter set, total, heating days) for every
+        combination with data, period by period
+        """
+        for period_index, period in enumerate(self.periods):
+            for set_index, parameter_set in enumerate(self.parameter_sets):
+                for location, name in enumerate(self.names):
+                    if self.valid_days[period_index, location]:
+                        yield (
+                            name, period, parameter_set,
+                            float(self.totals[period_index, set_index, location]),
+                            int(self.heating_days[period_index, set_index, location]))
+
+
+class SharedMatrix:
+    """
+    float64 (locations, days) matrix in shared memory, initialized to NaN
+
+    Callers fill the rows of array in place and pass the matrix itself to
+    calculate_sweep(), whose workers then map this block instead of a
+    copy. The block is freed by close() or when leaving the with block;
+    views into array must not outlive it.
+    """
+
+    def __init__(self, shape: Tuple[int, int]):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.shared_memory = SharedMemory(
+            create=True, size=max(1, self.shape[0] * self.shape[1] * np.dtype(np.float64).itemsize))
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.shared_memory.buf)
+        self.array.fill(np.nan)
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def close(self) -> None:
+        """Release and unlink the block"""
+        if self.shared_memory is None:
+            return
+        self.array = None
+        self.shared_memory.unlink()
+        try:
+            self.shared_memory.close()
+        except BufferError:
+            # A view still exists (e.g. held by a traceback); the mapping goes with it
+            logger.debug(f"Shared matrix {self.shared_memory.name} still in use, unmapped later")
+        self.shared_memory = None
+
+    def __enter__(self) -> 'SharedMatrix':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def pool_size(processes: Optional[int], locations: int) -> int:
+    """Worker processes used for a sweep, 1 computes in the calling process"""
+    return max(1, min(processes or os.cpu_count() or 1, locations))
+
+
+def sweep_rows(
+    temperatures: np.ndarray,
+    column_ranges: Sequence[Tuple[int, int]],
+    parameter_sets: Sequence[Tuple[float, float]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Totals of all periods and parameter sets for a block of locations
+
+    Args:
+        temperatures: (locations, days) matrix, NaN for days without data
+        column_ranges: (first, stop) day columns of every period
+        parameter_sets: Sequence of (room_temperature, heating_limit) tuples
+
+    Returns:
+        Tuple of totals and heating days as (periods, parameter sets,
+        locations) arrays and valid days as (periods, locations) array
+    """
+    totals = np.empty((len(column_ranges), len(parameter_sets), len(temperatures)))
+    heating_days = np.empty(totals.shape, dtype=np.int64)
+    valid_days = np.empty((len(column_ranges), len(temperatures)), dtype=np.int64)
+    for period_index, (first, stop) in enumerate(column_ranges):
+        block = temperatures[:, first:stop]
+        result = calculate_degree_days(block, parameter_sets)
+        totals[period_index] = result.totals
+        heating_days[period_index] = result.heating_days
+        valid_days[period_index] = np.count_nonzero(~np.isnan(block), axis=1)
+    return totals, heating_days, valid_days
+
+
+def _attach_matrix(name: str, shape: Tuple[int, int]) -> None:
+    """Pool initializer: map the shared temperature matrix into the worker"""
+    # Pool workers share the parent's resource tracker, the parent unlinks the block
+    shared_memory = SharedMemory(name=name)
+    _worker_state['shared_memory'] = shared_memory
+    _worker_state['matrix'] = np.ndarray(shape, dtype=np.float64, buffer=shared_memory.buf)
+
+
+def _sweep_shard(
+    start: int,
+    stop: int,
+    column_ranges: Sequence[Tuple[int, int]],
+    parameter_sets: Sequence[Tuple[float, float]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Worker task: sweep_rows() for the locations start:stop of the shared matrix"""
+    return sweep_rows(_worker_state['matrix'][start:stop], column_ranges, parameter_sets)
+
+
+def calculate_sweep(
+    temperatures: Union[np.ndarray, SharedMatrix],
+    start_date: str,
+    periods: Sequence[Tuple[str, str]],
+    parameter_sets: Sequence[Tuple[float, float]],
+    names: Optional[List[str]] = None,
+    processes: Optional[int] = None
+    ) -> SweepResult:
+    """
+    Heating degree day totals for every combination of period, parameter
+    set and location, spread over a process pool
+
+    Workers map the matrix from shared memory and get only the row range
+    of their shard, so no series are pickled. A SharedMatrix is used as it
+    is; a plain array is copied into shared memory first, which doubles
+    its memory while the sweep runs. Each worker returns the small total
+    arrays of its shard, which are merged in location order.
+
+    Args:
+        temperatures: (locations, days) matrix of daily means, NaN for days
+            without data, as array or SharedMatrix
+        start_date: Date of the first column in format 'YYYY-MM-DD'
+        periods: (start_date, end_date) tuples within the matrix columns
+        parameter_sets: Sequence of (room_temperature, heating_limit) tuples
+        names: Location names in row order, defaults to the row numbers
+        processes: Worker processes, defaults to the CPU count; 1 computes
+            in the calling process
+
+    Returns:
+        SweepResult of all combinations
+
+    Raises:
+        ValueError: For periods outside the matrix
+    """
+    shared = temperatures if isinstance(temperatures, SharedMatrix) else None
+    temperatures = shared.array if shared is not None else np.ascontiguousarray(temperatures, dtype=np.float64)
+    if temperatures.ndim != 2:
+        raise ValueError("Temperatures must be a (locations, days) array")
+    locations, days = temperatures.shape
+    first_day = np.datetime64(start_date, 'D')
+    column_ranges = []
+    for period_start, period_end in periods:
+        first = int((np.datetime64(period_start, 'D') - first_day).astype(np.int64))
+        stop = int((np.datetime64(period_end, 'D') - first_day).astype(np.int64)) + 1
+        if first < 0 or stop > days or first >= stop:
+            raise ValueError(f"Period {period_start} to {period_end} is outside the data")
+        column_ranges.append((first, stop))
+    parameter_sets = [(float(room), float(limit)) for room, limit in parameter_sets]
+
+    processes = pool_size(processes, locations)
+    longest = max(stop - first for first, stop in column_ranges)
+    shard_size = max(1, SHARD_BYTES // (len(parameter_sets) * longest * 9))
+    if processes > 1:
+        shard_size = min(shard_size, -(-locations // (processes * SHARDS_PER_PROCESS)))
+    shards = [(start, min(start + shard_size, locations)) for start in range(0, locations, shard_size)]
+
+    totals = np.empty((len(column_ranges), len(parameter_sets), locations))
+    heating_days = np.empty(totals.shape, dtype=np.int64)
+    valid_days = np.empty((len(column_ranges), locations), dtype=np.int64)
+
+    if processes == 1 or len(shards) == 1:
+        for start, stop in shards:
+            totals[:, :, start:stop], heating_days[:, :, start:stop], valid_days[:, start:stop] = \
+                sweep_rows(temperatures[start:stop], column_ranges, parameter_sets)
+    else:
+        logger.info(f"Sweeping {locations} locations in {len(shards)} shards on {processes} processes")
+        owned = shared is None
+        if owned:
+            shared = SharedMatrix(temperatures.shape)
+            shared.array[:] = temperatures
+        try:
+            with ProcessPoolExecutor(
+                    max_workers=processes, initializer=_attach_matrix,
+                    initargs=(shared.name, shared.shape)) as executor:
+                futures = {
+                    executor.submit(_sweep_shard, start, stop, column_ranges, parameter_sets): (start, stop)
+                    for start, stop in shards}
+                for future in as_completed(futures):
+                    start, stop = futures[future]
+                    totals[:, :, start:stop], heating_days[:, :, start:stop], valid_days[:, start:stop] = \
+                        future.result()
+        finally:
+            if owned:
+                shared.close()
+
+    return SweepResult(
+        names=names if names is not None else [str(index) for index in range(locations)],
+        periods=list(periods),
+        parameter_sets=parameter_sets,
+        totals=totals,
+        heating_days=heating_days,
+        valid_days=valid_days)
@@ -0,0 +1,90 @@
+import numpy as np
+from typing import List, Optional, Sequence, Union
+
+DateLike = Union[str, np.datetime64]
+
+
+class TemperatureSeries:
+    """
+    Daily series on a contiguous date index
+
+    Values are kept in a float64 NumPy array with NaN for days without data,
+    so the position of a day is its offset from the start date. Slicing by
+    date is therefore O(1) and returns a view instead of a copy.
+    """
+
+    __slots__ = ('start', 'values')
+
+    def __init__(self, start: DateLike, values: Union[np.ndarray, Sequence[Optional[float]]]):
+        """
+        Initialize the series
+
+        Args:
+            start: Date of the first value ('YYYY-MM-DD' or datetime64)
+            values: One value per day, None or NaN for missing days
+        """
+        self.start = np.datetime64(start, 'D')
+        if isinstance(values, np.ndarray):
+            self.values = values.astype(np.float64, copy=False)
+        else:
+            self.values = np.array(
+                [np.nan if value is None else value for value in values], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        return f"TemperatureSeries({self.start} to {self.end}, {self.valid_count} valid days)"
+
+    @property
+    def end(self) -> np.datetime64:
+        """Date of the last value"""
+        return self.start + np.timedelta64(len(self.values) - 1, 'D')
+
+    @property
+    def dates(self) -> np.ndarray:
+        """datetime64[D] array of all days"""
+        return self.start + np.arange(len(self.values)).astype('timedelta64[D]')
+
+    @property
+    def valid_mask(self) -> np.ndarray:
+        """Boolean array marking days with data"""
+        return ~np.isnan(self.values)
+
+    @property
+    def valid_count(self) -> int:
+        """Number of days with data"""
+        return int(np.count_nonzero(self.valid_mask))
+
+    def index_of(self, day: DateLike) -> int:
+        """Offset of a day from the start date"""
+        return int((np.datetime64(day, 'D') - self.start).astype(np.int64))
+
+    def slice(self, start: DateLike, end: DateLike) -> 'TemperatureSeries':
+        """
+        View of a period (both ends inclusive), clipped to the series
+
+        Args:
+            start: First day of the period
+            end: Last day of the period
+
+        Returns:
+            TemperatureSeries sharing memory with this series
+        """
+        first = max(self.index_of(start), 0)
+        last = min(self.index_of(end), len(self.values) - 1)
+        return TemperatureSeries(self.start + np.timedelta64(first, 'D'), self.values[first:last + 1])
+
+    def mean(self) -> float:
+        """Mean of the days with data, NaN if there are none"""
+        if not self.valid_count:
+            return float('nan')
+        return float(np.nanmean(self.values))
+
+    def valid_dates(self) -> List[str]:
+        """Date strings of the days with data"""
+        return np.datetime_as_string(self.dates[self.valid_mask]).tolist()
+
+    def valid_values(self) -> List[float]:
+        """Values of the days with data"""
+        return self.values[self.valid_mask].tolist()
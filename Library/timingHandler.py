@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+
+# Display names and order of the spans in the summary
+SPAN_LABELS = {
+    'rate_limit_wait': 'Wartezeit',
+    'http_request': 'HTTP',
+    'json_decode': 'JSON',
+    'validation': 'Validierung',
+    'degree_days': 'Gradtage',
+    'chart_build': 'Diagramm erstellen',
+    'chart_page_load': 'Diagrammseite laden',
+    'chart_load': 'Diagramm anzeigen'}
+
+
+@dataclass
+class Span:
+    """A timed section of work"""
+    name: str
+    start: float        # time.perf_counter() at the start
+    duration: float     # Seconds
+    thread: str
+    tags: Dict[str, str] = field(default_factory=dict)
+
+
+class Tracer:
+    """
+    Thread-safe collector of timing spans
+
+    Spans inherit the tags set with tags() in the same thread, so the HTTP
+    layer does not need to know which city a request belongs to.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the tracer
+
+        Args:
+            enabled: Record spans (disabled tracers only cost a function call)
+        """
+        self.enabled = enabled
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def current_tags(self) -> Dict[str, str]:
+        """Tags set in the current thread"""
+        return getattr(self._local, 'tags', {})
+
+    @contextmanager
+    def tags(self, **tags: str) -> Iterator[None]:
+        """Attach tags, e.g. city='Berlin', to all spans recorded in the block"""
+        previous = self.current_tags()
+        self._local.tags = {**previous, **tags}
+        try:
+            yield
+        finally:
+            self._local.tags = previous
+
+    @contextmanager
+    def span(self, name: str, **tags: str) -> Iterator[None]:
+        """Time the block as a span, also when it raises"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, **tags)
+
+    def record(self, name: str, start: float, duration: float, **tags: str) -> None:
+        """
+        Record a span measured elsewhere, e.g. across Qt callbacks
+
+        Args:
+            name: Span name
+            start: time.perf_counter() at the start
+            duration: Duration in seconds
+            tags: Tags in addition to the thread's current tags
+        """
+        if not self.enabled:
+            return
+        span = Span(name, start, duration, threading.current_thread().name, {**self.current_tags(), **tags})
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        """Copy of all recorded spans"""
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        """Drop all spans, e.g. before a new calculation"""
+        with self._lock:
+            self._spans.clear()
+            self._origin = time.perf_counter()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate the spans by name
+
+        Returns:
+            Dictionary with span names as keys and count, total, mean and
+            max (seconds) as values
+        """
+        summary: Dict[str, Dict[str, float]] = {}
+        for span in self.spans():
+            entry = summary.setdefault(span.name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            entry['count'] += 1
+            entry['total'] += span.duration
+            entry['max'] = max(entry['max'], span.duration)
+        for entry in summary.values():
+            entry['mean'] = entry['total'] / entry['count']
+        return summary
+
+    def summary_text(self) -> str:
+        """One-line summary of the total time per span, for a status bar"""
+        summary = self.summary()
+        names = [name for name in SPAN_LABELS if name in summary]
+        names += sorted(name for name in summary if name not in SPAN_LABELS)
+        return ' | '.join(
+            f"{SPAN_LABELS.get(name, name)}: {summary[name]['total']:.2f} s ({summary[name]['count']}x)"
+            for name in names)
+
+    def export_json(self, path: str) -> None:
+        """
+        Write the spans in the Chrome trace event format, viewable in
+        chrome://tracing or https://ui.perfetto.dev
+
+        Args:
+            path: Target path of the JSON trace
+        """
+        spans = self.spans()
+        threads = {name: index for index, name in enumerate(sorted({span.thread for span in spans}))}
+        # Metadata events naming the thread rows
+        events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+            for name, tid in threads.items()]
+        for span in spans:
+            events.append({
+                'name': span.name,
+                'cat': 'gradtagszahlen',
+                'ph': 'X',
+                'ts': (span.start - self._origin) * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': os.getpid(),
+                'tid': threads[span.thread],
+                'args': span.tags})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'summary': self.summary()}, f, ensure_ascii=False)
+
+
+# Process-wide tracer used by the library and the GUI
+tracer = Tracer()
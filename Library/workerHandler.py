@@ -0,0 +1,114 @@
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+if TYPE_CHECKING:
+    # Only for annotations, keeps numpy and requests out of the GUI startup
+    from Library.gradtagszahlenCalculator import GradtagszahlenCalculator, CityData
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by workers, delivered to receivers on the Qt main thread"""
+    result = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+    error = pyqtSignal(object)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """Runs a blocking callable on the QThreadPool"""
+
+    def __init__(self, fn: Callable[..., Any], *args, **kwargs):
+        """
+        Initialize the worker
+
+        Args:
+            fn: Callable to run off the main thread
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        """
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self) -> None:
+        """Run the callable, emitting result or error and finally finished"""
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Worker failed: {e}")
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class ProgressWorker(Worker):
+    """
+    Worker for callables accepting progress_callback and cancel_event
+    keyword arguments, which are connected to signals.progress and cancel()
+    """
+
+    def __init__(self, fn: Callable[..., Any], *args, **kwargs):
+        super().__init__(fn, *args, **kwargs)
+        self.cancel_event = threading.Event()
+        self.kwargs['progress_callback'] = self.signals.progress.emit
+        self.kwargs['cancel_event'] = self.cancel_event
+
+    def cancel(self) -> None:
+        """Ask the callable to stop"""
+        self.cancel_event.set()
+
+
+class CalculationWorker(QRunnable):
+    """
+    Runs GradtagszahlenCalculator.calculate_for_cities on the QThreadPool
+
+    Every CalculationResult is emitted through signals.result as soon as its
+    city is done, signals.progress reports (finished, total) cities.
+    """
+
+    def __init__(
+        self,
+        calculator: 'GradtagszahlenCalculator',
+        cities: List['CityData'],
+        **calculation_kwargs
+        ):
+        """
+        Initialize the worker
+
+        Args:
+            calculator: Calculator used for the run
+            cities: List of CityData objects
+            **calculation_kwargs: Further arguments for calculate_for_cities
+        """
+        super().__init__()
+        self.calculator = calculator
+        self.cities = cities
+        self.calculation_kwargs: Dict[str, Any] = calculation_kwargs
+        self.cancel_event = threading.Event()
+        self.signals = WorkerSignals()
+
+    def cancel(self) -> None:
+        """Stop after the cities that are currently being fetched"""
+        self.cancel_event.set()
+
+    def run(self) -> None:
+        """Run the calculation, streaming results through the signals"""
+        try:
+            self.calculator.calculate_for_cities(
+                cities=self.cities,
+                result_callback=self.signals.result.emit,
+                progress_callback=self.signals.progress.emit,
+                cancel_event=self.cancel_event,
+                **self.calculation_kwargs)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Calculation failed: {e}")
+            self.signals.error.emit(e)
+        finally:
+            self.signals.finished.emit()
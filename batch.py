@@ -0,0 +1,231 @@
+"""
+Gradtagszahlen ohne GUI berechnen, z.B. für nächtliche Läufe auf Servern
+
+Beispiel:
+    python batch.py standorte.csv --period 2023-10-01:2024-04-30 --period 2022-10-01:2023-04-30 \
+        --params 20/15 --params 18/12 --output ergebnisse.parquet --workers 8
+
+Die Standortdatei (CSV oder Excel) braucht eine Kopfzeile mit Spalten für
+Breiten- und Längengrad ('latitude'/'lat', 'longitude'/'lon') oder eine
+Adressspalte; Adressen ohne Koordinaten werden über Nominatim geokodiert.
+Mit --processes werden alle Kombinationen aus Zeiträumen, Parametersätzen
+und Standorten als Parameterstudie auf einem Prozesspool gerechnet; dabei
+entstehen nur Summen, keine Tageswerte.
+Es werden bewusst keine PyQt-Module importiert.
+"""
+import argparse
+import logging
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+from Library.gradtagszahlenCalculator import GradtagszahlenCalculator, CityData, CalculationResult
+from Library.crudHandler import CrudHandler
+from Library.cacheHandler import TemperatureCache, DEFAULT_CACHE_DIR
+from Library.seriesStore import SeriesStore
+from Library.geocodeHandler import (
+    Geocoder, GeocodeCache, DEFAULT_GEOCODE_CACHE_FILE, ADDRESS_COLUMNS, NAME_COLUMNS, read_table)
+from Library.exportHandler import create_exporter
+from Library.dataSource import create_source
+from Library.timingHandler import tracer
+from Library.degreeDayEngine import METRICS, DEFAULT_COOLING_BASE
+
+LATITUDE_COLUMNS = ('latitude', 'lat', 'breitengrad', 'breite')
+LONGITUDE_COLUMNS = ('longitude', 'lon', 'lng', 'längengrad', 'laengengrad', 'länge')
+
+logger = logging.getLogger('batch')
+
+
+def find_column(header: List[str], candidates: Tuple[str, ...]):
+    return next((header.index(c) for c in candidates if c in header), None)
+
+
+def parse_number(value: str) -> float:
+    # Dezimalkomma aus deutschen Excel-Exporten zulassen
+    return float(value.strip().replace(',', '.'))
+
+
+def read_locations(path: str, geocoder: Geocoder) -> List[CityData]:
+    rows = read_table(path)
+    if not rows:
+        return []
+    header = [column.strip().lower() for column in rows[0]]
+    lat_index = find_column(header, LATITUDE_COLUMNS)
+    lon_index = find_column(header, LONGITUDE_COLUMNS)
+    address_index = find_column(header, ADDRESS_COLUMNS)
+    name_index = find_column(header, NAME_COLUMNS)
+    if (lat_index is None or lon_index is None) and address_index is None:
+        raise ValueError("Standortdatei braucht Koordinaten- oder Adressspalten")
+
+    def cell(row, index):
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    cities = []
+    pending = []  # (Name, Adresse) ohne Koordinaten
+    for row in rows[1:]:
+        name = cell(row, name_index)
+        latitude, longitude = cell(row, lat_index), cell(row, lon_index)
+        if latitude and longitude:
+            latitude, longitude = parse_number(latitude), parse_number(longitude)
+            cities.append(CityData(name or f"{latitude:.4f}, {longitude:.4f}", latitude, longitude))
+        elif cell(row, address_index):
+            pending.append((name, cell(row, address_index)))
+
+    if pending:
+        results = geocoder.geocode_many([address for _, address in pending])
+        for name, address in pending:
+            result = results.get(address)
+            if result is None:
+                logger.warning(f"Adresse nicht gefunden: {address}")
+                continue
+            cities.append(CityData(name or address, result['lat'], result['lon']))
+    return cities
+
+
+def parse_period(value: str) -> Tuple[str, str]:
+    start, separator, end = value.partition(':')
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Zeitraum '{value}' nicht im Format START:ENDE")
+    return start.strip(), end.strip()
+
+
+def parse_parameter_set(value: str) -> Tuple[float, float]:
+    room, separator, limit = value.partition('/')
+    try:
+        return float(room), float(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Parameter '{value}' nicht im Format RAUM/HEIZGRENZE")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Gradtagszahlen ohne GUI berechnen")
+    parser.add_argument('locations', help="Standortdatei (.csv, .txt, .xlsx)")
+    parser.add_argument(
+        '--period', type=parse_period, action='append', required=True,
+        help="Zeitraum START:ENDE (YYYY-MM-DD), mehrfach möglich")
+    parser.add_argument(
+        '--params', type=parse_parameter_set, action='append',
+        help="Raumtemperatur/Heizgrenze, z.B. 20/15 (Standard), mehrfach möglich")
+    parser.add_argument(
+        '--metrics', nargs='+', choices=METRICS, default=['gradtagszahl'],
+        help="Kennzahlen: gradtagszahl (VDI 2067), heating_degree_days (Heizgradtage), "
+             "cooling_degree_days (Kühlgradtage), monthly (Monatswerte nach DIN V 4108-6)")
+    parser.add_argument(
+        '--cooling-base', type=float, default=DEFAULT_COOLING_BASE,
+        help=f"Basistemperatur der Kühlgradtage (Standard: {DEFAULT_COOLING_BASE:g})")
+    parser.add_argument('--output', required=True, help="Ergebnisdatei (.csv, .xlsx, .parquet)")
+    parser.add_argument('--workers', type=int, default=8, help="Parallele Anfragen (Standard: 8)")
+    parser.add_argument('--batch-size', type=int, default=20, help="Standorte je Anfrage (Standard: 20)")
+    parser.add_argument(
+        '--processes', type=int,
+        help="Parameterstudie auf N Prozessen rechnen (0 = alle Kerne); "
+             "schreibt nur Summen, keine Tageswerte")
+    parser.add_argument(
+        '--requests-per-second', type=float, default=5.0, help="Anfragelimit (Standard: 5)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Verzeichnis des Temperatur-Caches")
+    parser.add_argument(
+        '--timezone', default='auto',
+        help="Zeitzone der Tageswerte, 'GMT' spart die Zeitzonensuche je Standort (Standard: auto)")
+    parser.add_argument(
+        '--grid-resolution', type=float,
+        help="Standorte in einer Gitterzelle dieser Weite (Grad, z.B. 0.1 wie ERA5-Land) mit einer "
+             "Anfrage abrufen; spart Anfragen, verändert aber die Ergebnisse (Standard: nur gleiche Koordinaten)")
+    parser.add_argument(
+        '--source', help="Lokales Temperaturarchiv (.parquet, .nc, .zarr) statt der Open-Meteo-API")
+    parser.add_argument(
+        '--cache-format', choices=('json', 'binary'), default='json',
+        help="Format des Temperatur-Caches: 'json' (mit Größenbegrenzung) oder 'binary' "
+             "(kompakt, memory-mapped, ohne Größenbegrenzung) (Standard: json)")
+    parser.add_argument('--no-cache', action='store_true', help="Temperatur-Cache nicht verwenden")
+    parser.add_argument('--trace', help="Zeitprofil als JSON-Trace speichern")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Ausführliche Protokollierung")
+    return parser
+
+
+def run(args: argparse.Namespace) -> int:
+    parameter_sets = args.params or [(20.0, 15.0)]
+    geocoder = Geocoder(GeocodeCache(DEFAULT_GEOCODE_CACHE_FILE))
+    cities = read_locations(args.locations, geocoder)
+    if not cities:
+        logger.error("Keine Standorte gefunden")
+        return 1
+    logger.info(
+        f"{len(cities)} Standorte, {len(args.period)} Zeiträume, {len(parameter_sets)} Parametersätze")
+
+    if args.no_cache:
+        cache = None
+    elif args.cache_format == 'binary':
+        cache = SeriesStore(args.cache_dir)
+    else:
+        cache = TemperatureCache(args.cache_dir)
+    # Lokale Archive: keine Anfragelimits, reproduzierbar ohne Netzwerk
+    source = create_source(args.source) if args.source else None
+    failed = 0
+    with CrudHandler(
+            "https://archive-api.open-meteo.com/v1",
+            requests_per_second=args.requests_per_second,
+            pool_size=max(args.workers, 1)) as crud_handler, create_exporter(args.output) as exporter:
+        calculator = GradtagszahlenCalculator(
+            crud_handler, cache=cache, timezone=args.timezone,
+            grid_resolution=args.grid_resolution, source=source)
+        if args.processes is not None:
+            # Parameterstudie: alle Kombinationen auf einem Prozesspool, nur Summen
+            sweep = calculator.calculate_sweep(
+                cities, args.period, parameter_sets,
+                processes=args.processes or None,
+                max_workers=args.workers,
+                batch_size=args.batch_size)
+            for name, (start_date, end_date), (room, limit), total, heating_days in sweep.iter_rows():
+                exporter.write_result(CalculationResult(
+                    name, total, heating_days, start_date, end_date, room, limit))
+            failed += int(np.count_nonzero(sweep.valid_days == 0))
+        elif len(args.period) > 1:
+            # Mehrere Zeiträume: der Gesamtzeitraum wird je Standort einmal abgerufen
+            results = calculator.calculate_periods_for_parameter_sets(
+                cities, args.period, parameter_sets,
+                max_workers=args.workers,
+                batch_size=args.batch_size,
+                result_callback=exporter.write_result,
+                metrics=args.metrics,
+                cooling_base=args.cooling_base)
+            failed += len(cities) * len(args.period) - sum(
+                len(periods) for periods in next(iter(results.values())).values())
+        else:
+            start_date, end_date = args.period[0]
+            # Ergebnisse werden geschrieben, sobald ein Standort fertig ist
+            results = calculator.calculate_for_parameter_sets(
+                cities, start_date, end_date, parameter_sets,
+                max_workers=args.workers,
+                batch_size=args.batch_size,
+                result_callback=exporter.write_result,
+                metrics=args.metrics,
+                cooling_base=args.cooling_base)
+            failed += len(cities) - len(next(iter(results.values())))
+    if failed:
+        logger.warning(f"{failed} Berechnungen fehlgeschlagen")
+    logger.info(tracer.summary_text())
+    if args.trace:
+        tracer.export_json(args.trace)
+    logger.info(f"{exporter.count} Ergebnisse geschrieben nach {args.output}")
+    return 0 if exporter.count else 1
+
+
+def main(argv: List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.processes is not None and set(args.metrics) != {'gradtagszahl'}:
+        parser.error("--processes berechnet nur die Gradtagszahl, --metrics ist nicht kombinierbar")
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    logger.setLevel(logging.INFO)
+    try:
+        return run(args)
+    except (ValueError, ImportError, OSError) as e:
+        logger.error(str(e))
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+Benchmarks for CrudHandler, GradtagszahlenCalculator, the degree-day
+engine and the SeriesStore against a local mock of the Open-Meteo archive
+and Nominatim
+
+Runs offline. Example:
+    python -m benchmarks.benchmarkRunner --sizes 10 100 1000 --output report.json
+    python -m benchmarks.benchmarkRunner --error-rate 0.02 --throttle 50 --baseline report.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from Library.cacheHandler import TemperatureCache
+from Library.crudHandler import JSON_DECODER, CrudHandler, decode_json
+from Library.degreeDayEngine import calculate_degree_days
+from Library.geocodeHandler import GeocodeCache, Geocoder
+from Library.gradtagszahlenCalculator import CityData, GradtagszahlenCalculator
+from Library.seriesStore import SeriesStore
+from benchmarks.mockServer import MockOpenMeteoServer, MockServerConfig, synthetic_temperatures
+
+REPORT_VERSION = 1
+PARAMETER_SETS = [(20.0, 15.0), (18.0, 12.0), (21.0, 15.0)]
+
+logger = logging.getLogger('benchmarks')
+
+
+def make_cities(count: int) -> List[CityData]:
+    """Deterministic grid of locations across Germany"""
+    columns = int(np.ceil(np.sqrt(count)))
+    return [
+        CityData(
+            f"Standort {index + 1}",
+            round(47.5 + 7.0 * (index // columns) / columns, 4),
+            round(6.0 + 9.0 * (index % columns) / columns, 4))
+        for index in range(count)]
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    """Percentiles of per-call latencies in milliseconds"""
+    if not latencies:
+        return {}
+    values = np.array(latencies) * 1000.0
+    return {
+        'calls': len(values),
+        'latency_p50_ms': float(np.percentile(values, 50)),
+        'latency_p90_ms': float(np.percentile(values, 90)),
+        'latency_p99_ms': float(np.percentile(values, 99)),
+        'latency_max_ms': float(values.max())}
+
+
+def timed_handler(base_url: str, args: argparse.Namespace, latencies: List[float]) -> CrudHandler:
+    """CrudHandler recording the duration of every get() call"""
+    crud_handler = CrudHandler(
+        base_url, pool_size=max(args.workers, 1), max_retries=args.max_retries)
+    original_get = crud_handler.get
+
+    def get(endpoint, params=None):
+        started = time.perf_counter()
+        try:
+            return original_get(endpoint, params)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    crud_handler.get = get
+    return crud_handler
+
+
+def run_calculation(
+    mock: MockOpenMeteoServer,
+    args: argparse.Namespace,
+    size: int,
+    cache: Optional[TemperatureCache] = None
+    ) -> Dict[str, float]:
+    """End-to-end calculation of size locations against the mock server"""
+    cities = make_cities(size)
+    latencies: List[float] = []
+    mock.reset_counts()
+    with timed_handler(mock.base_url, args, latencies) as crud_handler:
+        calculator = GradtagszahlenCalculator(crud_handler, cache=cache)
+        started = time.perf_counter()
+        results = calculator.calculate_for_parameter_sets(
+            cities, args.start_date, args.end_date, PARAMETER_SETS,
+            max_workers=args.workers, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+    succeeded = len(next(iter(results.values())))
+    metrics = {
+        'seconds': elapsed,
+        'locations_per_second': size / elapsed,
+        'succeeded': succeeded,
+        'failed': size - succeeded,
+        'http_requests': mock.request_count,
+        'http_429': mock.status_counts.get(429, 0),
+        'http_500': mock.status_counts.get(500, 0)}
+    metrics.update(latency_stats(latencies))
+    return metrics
+
+
+def run_geocoding(mock: MockOpenMeteoServer, args: argparse.Namespace, size: int) -> Dict[str, float]:
+    """Geocoding of size distinct addresses (plus duplicates) with an empty cache"""
+    addresses = [f"Musterstraße {index}, {10000 + index} Musterstadt" for index in range(size)]
+    cache_dir = tempfile.mkdtemp(prefix='geocode_benchmark_')
+    try:
+        geocoder = Geocoder(
+            GeocodeCache(os.path.join(cache_dir, 'geocode_cache.json')),
+            base_url=mock.geocode_url,
+            requests_per_second=args.geocode_rps)
+        mock.reset_counts()
+        started = time.perf_counter()
+        results = geocoder.geocode_many(addresses + addresses[:size // 2])
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return {
+        'seconds': elapsed,
+        'addresses_per_second': size / elapsed,
+        'found': sum(result is not None for result in results.values()),
+        'http_requests': mock.request_count}
+
+
+def run_engine(size: int, days: int, repeat: int) -> Dict[str, float]:
+    """Degree-day computation alone on a locations x days matrix"""
+    rng = np.random.default_rng(0)
+    temperatures = rng.normal(5.0, 6.0, (size, days))
+    temperatures[rng.random((size, days)) < 0.01] = np.nan
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        calculate_degree_days(temperatures, PARAMETER_SETS)
+        timings.append(time.perf_counter() - started)
+    median = float(np.median(timings))
+    return {
+        'median_ms': median * 1000.0,
+        'min_ms': float(min(timings)) * 1000.0,
+        'location_days_per_second': size * days * len(PARAMETER_SETS) / median}
+
+
+def run_json_decode(size: int, days: int, repeat: int) -> Dict[str, float]:
+    """Decoding of a multi-location archive response, fast decoder vs. json module"""
+    times = list(range(0, days * 86400, 86400))
+    payload = json.dumps([
+        {'latitude': city.latitude, 'longitude': city.longitude, 'utc_offset_seconds': 0,
+         'daily': {'time': times, 'temperature_2m_mean': synthetic_temperatures(
+             city.latitude, city.longitude, '2020-01-01', str(np.datetime64('2020-01-01') + days - 1))}}
+        for city in make_cities(size)]).encode('utf-8')
+    metrics = {'payload_mb': len(payload) / 1e6}
+    for name, decode in (('fast', decode_json), ('stdlib', json.loads)):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            decode(payload)
+            timings.append(time.perf_counter() - started)
+        metrics[f"{name}_median_ms"] = float(np.median(timings)) * 1000.0
+    return metrics
+
+
+def run_series_store(size: int, days: int) -> Dict[str, float]:
+    """Writing, reopening and reading a SeriesStore of size locations x days"""
+    store_dir = tempfile.mkdtemp(prefix='series_store_benchmark_')
+    try:
+        cities = make_cities(size)
+        end = np.datetime64(date.today()) - 30
+        dates = np.arange(end - days + 1, end + 1)
+        start_date, end_date = str(dates[0]), str(dates[-1])
+        store = SeriesStore(store_dir)
+        started = time.perf_counter()
+        for city in cities:
+            store.store_values(
+                city.latitude, city.longitude, 'temperature_2m_mean', dates,
+                np.array(synthetic_temperatures(city.latitude, city.longitude, start_date, end_date)))
+        written = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store = SeriesStore(store_dir)
+        store.lookup_values(cities[0].latitude, cities[0].longitude, 'temperature_2m_mean', end_date, end_date)
+        reopened = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for city in cities:
+            store.lookup_values(city.latitude, city.longitude, 'temperature_2m_mean', start_date, end_date)
+        read = time.perf_counter() - started
+        size_bytes = sum(entry.stat().st_size for entry in os.scandir(store_dir))
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    return {
+        'write_seconds': written,
+        'reopen_ms': reopened * 1000.0,
+        'read_all_ms': read * 1000.0,
+        'store_mb': size_bytes / 1e6}
+
+
+def measure(name: str, function: Callable[[], Dict[str, float]], report: Dict) -> None:
+    logger.info(f"Running {name}")
+    report['results'][name] = function()
+    print(format_metrics(name, report['results'][name]))
+
+
+def format_metrics(name: str, metrics: Dict[str, float]) -> str:
+    values = ', '.join(
+        f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in metrics.items())
+    return f"{name:<28} {values}"
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(baseline: Dict, report: Dict) -> List[str]:
+    """
+    Relative change of every metric present in both reports
+
+    Args:
+        baseline: Earlier report loaded from JSON
+        report: Current report
+
+    Returns:
+        Lines 'scenario metric: baseline -> current (+x.x%)'
+    """
+    lines = []
+    if baseline.get('config') != report['config']:
+        lines.append("Warning: configuration differs from the baseline")
+    for name, metrics in report['results'].items():
+        for key, value in metrics.items():
+            previous = baseline.get('results', {}).get(name, {}).get(key)
+            if not isinstance(previous, (int, float)) or not previous:
+                continue
+            change = (value - previous) / previous * 100.0
+            lines.append(f"{name:<28} {key:<26} {previous:>12.2f} -> {value:>12.2f} ({change:+.1f}%)")
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a mock Open-Meteo server")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help="Numbers of locations")
+    parser.add_argument('--start-date', default='2023-10-01')
+    parser.add_argument('--end-date', default='2024-04-30')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--max-retries', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=20.0, help="Mock latency in ms")
+    parser.add_argument('--jitter', type=float, default=5.0, help="Mock latency jitter in ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of HTTP 500 answers")
+    parser.add_argument('--throttle', type=float, default=None, help="Mock requests per second before 429")
+    parser.add_argument('--geocode-size', type=int, default=100, help="Distinct addresses, 0 to skip")
+    parser.add_argument('--geocode-rps', type=float, default=1000.0, help="Geocoder request limit")
+    parser.add_argument('--engine-days', type=int, default=365 * 3)
+    parser.add_argument('--engine-repeat', type=int, default=20)
+    parser.add_argument('--store-days', type=int, default=365 * 20, help="Days per location in the store benchmark")
+    parser.add_argument('--output', help="Write the report as JSON")
+    parser.add_argument('--baseline', help="Earlier JSON report to compare against")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        # Per-city log lines and error isolation messages would dominate the output
+        logging.getLogger('Library').setLevel(logging.CRITICAL)
+
+    mock_config = MockServerConfig(
+        latency_ms=args.latency, jitter_ms=args.jitter,
+        error_rate=args.error_rate, throttle_rps=args.throttle)
+    report = {
+        'version': REPORT_VERSION,
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'json_decoder': JSON_DECODER,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()},
+        'config': {
+            'mock': asdict(mock_config),
+            'period': [args.start_date, args.end_date],
+            'workers': args.workers,
+            'batch_size': args.batch_size,
+            'max_retries': args.max_retries,
+            'parameter_sets': [list(parameter_set) for parameter_set in PARAMETER_SETS]},
+        'results': {}}
+
+    with MockOpenMeteoServer(mock_config) as mock:
+        for size in args.sizes:
+            measure(f"calculate_{size}", lambda: run_calculation(mock, args, size), report)
+            cache_dir = tempfile.mkdtemp(prefix='temperature_benchmark_')
+            try:
+                cache = TemperatureCache(cache_dir)
+                run_calculation(mock, args, size, cache)
+                measure(f"calculate_{size}_cached", lambda: run_calculation(mock, args, size, cache), report)
+            finally:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+        if args.geocode_size:
+            measure(f"geocode_{args.geocode_size}", lambda: run_geocoding(mock, args, args.geocode_size), report)
+
+    for size in args.sizes:
+        measure(
+            f"engine_{size}x{args.engine_days}",
+            lambda: run_engine(size, args.engine_days, args.engine_repeat), report)
+
+    measure(
+        f"json_decode_{max(args.sizes)}x{args.engine_days}",
+        lambda: run_json_decode(max(args.sizes), args.engine_days, args.engine_repeat), report)
+
+    measure(
+        f"series_store_{max(args.sizes)}x{args.store_days}",
+        lambda: run_series_store(max(args.sizes), args.store_days), report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nComparison with {args.baseline}:")
+        for line in compare_reports(baseline, report):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+# First day of the synthetic archive
+ARCHIVE_START = np.datetime64('1940-01-01', 'D')
+
+
+@dataclass
+class MockServerConfig:
+    """Behaviour of the mock server"""
+    latency_ms: float = 20.0        # Base latency added to every response
+    jitter_ms: float = 5.0          # Uniform random latency added on top
+    per_location_ms: float = 0.5    # Extra latency per location of a multi-coordinate request
+    error_rate: float = 0.0         # Share of requests answered with HTTP 500
+    throttle_rps: Optional[float] = None  # Requests per second before answering 429
+    retry_after: int = 1            # Retry-After header of 429 responses (seconds)
+    seed: int = 42                  # Seed for latency jitter and errors
+
+
+def synthetic_temperatures(latitude: float, longitude: float, start_date: str, end_date: str) -> List[float]:
+    """
+    Deterministic daily mean temperatures with a seasonal cycle,
+    colder towards the north, so results are comparable across runs
+
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        start_date: First day in format 'YYYY-MM-DD'
+        end_date: Last day in format 'YYYY-MM-DD'
+
+    Returns:
+        Daily values rounded to one decimal like the real API
+    """
+    days = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+    day_of_year = (days - days.astype('datetime64[Y]')).astype(np.int64)
+    # Noise drawn from the archive start on, so a day has the same value in every requested range
+    rng = np.random.default_rng(zlib.crc32(f"{latitude:.2f},{longitude:.2f}".encode()))
+    offset = int((days[0] - ARCHIVE_START).astype(np.int64))
+    noise = rng.normal(0.0, 3.0, offset + len(days))[offset:]
+    values = (
+        10.0 - 0.5 * (latitude - 50.0)
+        - 9.0 * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)
+        + noise)
+    return np.round(values, 1).tolist()
+
+
+class MockOpenMeteoServer:
+    """
+    Local stand-in for the Open-Meteo archive and Nominatim search endpoints
+
+    Serves GET /v1/archive (single and comma-separated coordinates) and
+    GET /search on 127.0.0.1 with configurable latency, throttling and
+    error rate. Counts requests per status code for the reports.
+    """
+
+    def __init__(self, config: Optional[MockServerConfig] = None, port: int = 0):
+        """
+        Initialize the server (not started yet)
+
+        Args:
+            config: Server behaviour, defaults to MockServerConfig()
+            port: Port to bind, 0 picks a free one
+        """
+        self.config = config or MockServerConfig()
+        self.logger = logging.getLogger(__name__)
+        self.status_counts: Counter = Counter()
+        self.locations_served = 0
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._request_times: List[float] = []
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to CrudHandler instead of the archive API"""
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    @property
+    def geocode_url(self) -> str:
+        """Base URL to pass to Geocoder instead of Nominatim"""
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def request_count(self) -> int:
+        """Number of requests answered so far"""
+        return sum(self.status_counts.values())
+
+    def start(self) -> 'MockOpenMeteoServer':
+        """Serve requests in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self) -> None:
+        """Reset the request statistics between benchmark runs"""
+        with self._lock:
+            self.status_counts.clear()
+            self.locations_served = 0
+
+    def __enter__(self) -> 'MockOpenMeteoServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def _decide_status(self) -> int:
+        """Status of the next response according to throttling and error rate"""
+        with self._lock:
+            now = time.monotonic()
+            if self.config.throttle_rps:
+                # Sliding one second window
+                self._request_times = [t for t in self._request_times if now - t < 1.0]
+                if len(self._request_times) >= self.config.throttle_rps:
+                    return 429
+                self._request_times.append(now)
+            if self.config.error_rate and self._random.random() < self.config.error_rate:
+                return 500
+            return 200
+
+    def _delay(self, locations: int) -> float:
+        with self._lock:
+            jitter = self._random.uniform(0.0, self.config.jitter_ms)
+        return (self.config.latency_ms + jitter + self.config.per_location_ms * locations) / 1000.0
+
+    def _archive_response(self, query: Dict[str, List[str]]):
+        latitudes = [float(value) for value in query['latitude'][0].split(',')]
+        longitudes = [float(value) for value in query['longitude'][0].split(',')]
+        start_date, end_date = query['start_date'][0], query['end_date'][0]
+        variable = query.get('daily', ['temperature_2m_mean'])[0]
+        days = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+        if query.get('timeformat', ['iso8601'])[0] == 'unixtime':
+            time_column = days.astype('datetime64[s]').astype(np.int64).tolist()
+        else:
+            time_column = np.datetime_as_string(days).tolist()
+        locations = [
+            {
+                'latitude': latitude,
+                'longitude': longitude,
+                'utc_offset_seconds': 0,
+                'daily': {
+                    'time': time_column,
+                    variable: synthetic_temperatures(latitude, longitude, start_date, end_date)}}
+            for latitude, longitude in zip(latitudes, longitudes)]
+        with self._lock:
+            self.locations_served += len(locations)
+        return locations if len(locations) > 1 else locations[0], len(locations)
+
+    def _search_response(self, query: Dict[str, List[str]]):
+        address = query.get('q', [''])[0]
+        if not address or 'unbekannt' in address.lower():
+            return [], 1
+        # Stable pseudo coordinates inside Germany
+        digest = zlib.crc32(address.lower().encode())
+        return [{
+            'lat': str(47.5 + (digest % 5000) / 1000.0),
+            'lon': str(6.0 + (digest // 5000 % 8000) / 1000.0),
+            'display_name': address}], 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                status = server._decide_status()
+                try:
+                    if url.path.endswith('/archive'):
+                        body, locations = server._archive_response(query)
+                    elif url.path.endswith('/search'):
+                        body, locations = server._search_response(query)
+                    else:
+                        status, body, locations = 404, {'error': True, 'reason': 'Not found'}, 1
+                except (KeyError, ValueError) as e:
+                    status, body, locations = 400, {'error': True, 'reason': str(e)}, 1
+                time.sleep(server._delay(locations))
+                if status in (429, 500):
+                    body = {'error': True, 'reason': 'Too many requests' if status == 429 else 'Server error'}
+                payload = json.dumps(body).encode('utf-8')
+                # Counted before the response goes out, the client may read the counts right after it
+                with server._lock:
+                    server.status_counts[status] += 1
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                if status == 429:
+                    self.send_header('Retry-After', str(server.config.retry_after))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Run the mock server stand-alone, e.g. to point the GUI at it
+    logging.basicConfig(level=logging.INFO)
+    with MockOpenMeteoServer(port=8765) as mock:
+        print(f"Archive: {mock.base_url}/archive, Nominatim: {mock.geocode_url}/search")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
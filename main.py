@@ -1,24 +1,30 @@
+import time
+STARTUP_TIME = time.perf_counter()
+
 import sys
 import os
-import tempfile
-import requests
-import pandas as pd
-import plotly.graph_objects as go
-import json
-from datetime import datetime, timedelta
+from functools import partial
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QDateEdit, QDoubleSpinBox,
     QListWidget, QGroupBox, QFormLayout, QListWidgetItem, QMessageBox, QDialog,
-    QScrollArea, QFrame)
-from PyQt5.QtCore import QDate, Qt, QUrl
+    QProgressBar, QFileDialog, QCheckBox)
+from PyQt5.QtCore import QCoreApplication, QDate, Qt, QThreadPool, QTimer
 from PyQt5.QtGui import QFont
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from Library.gradtagszahlenCalculator import GradtagszahlenCalculator, CityData
-from Library.crudHandler import CrudHandler
+from Library.workerHandler import Worker, ProgressWorker, CalculationWorker
+from Library.timingHandler import tracer
+
+# Berechnung, Diagramme (plotly, QtWebEngine), Karte und Export werden erst bei
+# der ersten Verwendung importiert, damit das Fenster schnell erscheint
+IMPORT_TIME = time.perf_counter()
+
+
+def create_geocoder():
+    from Library.geocodeHandler import Geocoder, GeocodeCache, DEFAULT_GEOCODE_CACHE_FILE
+    return Geocoder(GeocodeCache(DEFAULT_GEOCODE_CACHE_FILE))
 
 class CityDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, geocoder=None):
         super().__init__(parent)
         self.setWindowTitle("Adresse hinzufügen")
         self.setGeometry(200, 200, 800, 600)
@@ -26,6 +32,9 @@ class CityDialog(QDialog):
         self.selected_lat = 52.5244
         self.selected_lon = 13.4105
         self.selected_address = ""
+        self.search_query = ""
+        self.search_worker = None
+        self.geocoder = geocoder or create_geocoder()
 
         layout = QVBoxLayout(self)
         address_group = QGroupBox("Adresseingabe")
@@ -39,7 +48,9 @@ class CityDialog(QDialog):
         layout.addWidget(address_group)
         map_group = QGroupBox("Kartenansicht")
         map_layout = QVBoxLayout(map_group)
-        self.map_view = QWebEngineView()
+        # Web-Engine erst beim Öffnen des Dialogs laden
+        from Library.mapHandler import MapView
+        self.map_view = MapView()
         self.create_map()
         map_layout.addWidget(self.map_view)
         layout.addWidget(map_group)
@@ -57,44 +68,7 @@ class CityDialog(QDialog):
         layout.addLayout(button_layout)
 
     def create_map(self):
-        try:
-            lat = self.selected_lat
-            lon = self.selected_lon
-            address = self.selected_address.replace("'", "&#39;")
-            leaflet_html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset='utf-8'/>
-                <meta name='viewport' content='width=device-width, initial-scale=1.0'>
-                <title>Karte</title>
-                <link rel='stylesheet' href='https://unpkg.com/leaflet@1.9.4/dist/leaflet.css'/>
-                <style> #map {{ height: 100vh; width: 100vw; margin:0; }} html, body {{ height:100%; margin:0; }} </style>
-            </head>
-            <body>
-                <div id='map'></div>
-                <script src='https://unpkg.com/leaflet@1.9.4/dist/leaflet.js'></script>
-                <script>
-                    var map = L.map('map').setView([{lat}, {lon}], 13);
-                    L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
-                        maxZoom: 19,
-                        attribution: '© OpenStreetMap contributors'
-                    }}).addTo(map);
-                    var marker = L.marker([{lat}, {lon}]).addTo(map)
-                        .bindPopup('<b>Ausgewählter Standort</b><br>{address}')
-                        .openPopup();
-                </script>
-            </body>
-            </html>
-            """
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
-            temp_file.write(leaflet_html)
-            temp_file.close()
-            self.map_view.load(QUrl.fromLocalFile(temp_file.name))
-        except Exception as e:
-            print(f"Map creation error: {e}")
-            if hasattr(self, 'map_view'):
-                self.map_view.setHtml(f"<h3>Karte konnte nicht geladen werden: {e}</h3>")
+        self.map_view.show_location(self.selected_lat, self.selected_lon, self.selected_address)
 
     def search_address(self):
         address = self.address_input.text().strip()
@@ -103,31 +77,37 @@ class CityDialog(QDialog):
             return
         self.search_btn.setText("Suche...")
         self.search_btn.setEnabled(False)
-        try:
-            url = "https://nominatim.openstreetmap.org/search"
-            params = {'q': address, 'format': 'json', 'limit': 1, 'addressdetails': 1}
-            headers = {'User-Agent': 'Gradtagszahlen-Tool'}
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            if data:
-                result = data[0]
-                self.selected_lat = float(result['lat'])
-                self.selected_lon = float(result['lon'])
-                self.selected_address = result.get('display_name', address)
-                self.create_map()
-                QMessageBox.information(self, "Gefunden!", f"Adresse gefunden:\n{self.selected_address}\n\nKoordinaten:\nLat: {self.selected_lat:.6f}\nLon: {self.selected_lon:.6f}")
-            else:
-                QMessageBox.warning(self, "Nicht gefunden", f"Keine Ergebnisse für '{address}' gefunden.\nBitte überprüfen Sie die Schreibweise.")
-        except requests.exceptions.Timeout:
+        self.search_query = address
+        # Suche im Hintergrund, damit der Dialog bedienbar bleibt
+        self.search_worker = Worker(self.geocoder.geocode, address)
+        self.search_worker.signals.result.connect(self.on_search_result)
+        self.search_worker.signals.error.connect(self.on_search_error)
+        self.search_worker.signals.finished.connect(self.on_search_finished)
+        QThreadPool.globalInstance().start(self.search_worker)
+
+    def on_search_result(self, result):
+        if result:
+            self.selected_lat = result['lat']
+            self.selected_lon = result['lon']
+            self.selected_address = result['display_name']
+            self.create_map()
+            QMessageBox.information(self, "Gefunden!", f"Adresse gefunden:\n{self.selected_address}\n\nKoordinaten:\nLat: {self.selected_lat:.6f}\nLon: {self.selected_lon:.6f}")
+        else:
+            QMessageBox.warning(self, "Nicht gefunden", f"Keine Ergebnisse für '{self.search_query}' gefunden.\nBitte überprüfen Sie die Schreibweise.")
+
+    def on_search_error(self, error):
+        import requests
+        if isinstance(error, requests.exceptions.Timeout):
             QMessageBox.critical(self, "Fehler", "Zeitüberschreitung bei der Suche. Bitte erneut versuchen.")
-        except requests.exceptions.ConnectionError:
+        elif isinstance(error, requests.exceptions.ConnectionError):
             QMessageBox.critical(self, "Fehler", "Keine Internetverbindung. Bitte Verbindung prüfen.")
-        except Exception as e:
-            QMessageBox.critical(self, "Fehler", f"Suchfehler: {str(e)}")
-        finally:
-            self.search_btn.setText("Suchen")
-            self.search_btn.setEnabled(True)
+        else:
+            QMessageBox.critical(self, "Fehler", f"Suchfehler: {str(error)}")
+
+    def on_search_finished(self):
+        self.search_btn.setText("Suchen")
+        self.search_btn.setEnabled(True)
+        self.search_worker = None
 
     def accept_city(self):
         if not self.selected_address and not self.address_input.text().strip():
@@ -144,6 +124,14 @@ class GradtagsberechnungGUI(QMainWindow):
         super().__init__()
         self.setWindowTitle("Gradtagszahlen-Berechnung")
         self.setGeometry(100, 100, 1200, 800)
+        self.temperature_cache = None
+        self.crud_handler = None
+        self.geocoder = None
+        self.chart_view = None
+        self.results = {}
+        self.calculation_worker = None
+        self.import_worker = None
+        self.import_entries = []
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QHBoxLayout(central_widget)
@@ -190,6 +178,13 @@ class GradtagsberechnungGUI(QMainWindow):
         self.heating_limit.setSuffix(" °C")
         self.heating_limit.setDecimals(1)
         parameter_layout.addRow("Heizgrenze:", self.heating_limit)
+        # Zusätzliche Kennzahlen, werden im selben Durchlauf berechnet
+        self.hgt_check = QCheckBox("Heizgradtage")
+        parameter_layout.addRow("Kennzahlen:", self.hgt_check)
+        self.cdd_check = QCheckBox("Kühlgradtage (Basis 18 °C)")
+        parameter_layout.addRow("", self.cdd_check)
+        self.monthly_check = QCheckBox("Monatswerte (DIN V 4108-6)")
+        parameter_layout.addRow("", self.monthly_check)
         left_layout.addWidget(parameter_group)
         cities_group = QGroupBox("Adressen für Berechnung")
         cities_layout = QVBoxLayout(cities_group)
@@ -205,6 +200,13 @@ class GradtagsberechnungGUI(QMainWindow):
         self.remove_city_btn.clicked.connect(self.remove_city)
         city_buttons_layout.addWidget(self.remove_city_btn)
         cities_layout.addLayout(city_buttons_layout)
+        self.import_btn = QPushButton("Adressen importieren (CSV/Excel)")
+        self.import_btn.clicked.connect(self.import_addresses)
+        cities_layout.addWidget(self.import_btn)
+        self.import_progress = QProgressBar()
+        self.import_progress.setFormat("%v / %m Adressen geokodiert")
+        self.import_progress.setVisible(False)
+        cities_layout.addWidget(self.import_progress)
         left_layout.addWidget(cities_group)
         action_group = QGroupBox("Aktionen")
         action_layout = QVBoxLayout(action_group)
@@ -215,10 +217,22 @@ class GradtagsberechnungGUI(QMainWindow):
         """)
         self.calculate_btn.clicked.connect(self.start_calculation)
         action_layout.addWidget(self.calculate_btn)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("%v / %m Adressen")
+        self.progress_bar.setVisible(False)
+        action_layout.addWidget(self.progress_bar)
+        self.cancel_btn = QPushButton("Abbrechen")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_calculation)
+        action_layout.addWidget(self.cancel_btn)
         self.export_btn = QPushButton("Ergebnisse exportieren")
         self.export_btn.setEnabled(False)
         self.export_btn.clicked.connect(self.export_results)
         action_layout.addWidget(self.export_btn)
+        self.trace_btn = QPushButton("Zeitprofil exportieren")
+        self.trace_btn.setEnabled(False)
+        self.trace_btn.clicked.connect(self.export_trace)
+        action_layout.addWidget(self.trace_btn)
         self.clear_btn = QPushButton("Zurücksetzen")
         self.clear_btn.clicked.connect(self.reset_form)
         action_layout.addWidget(self.clear_btn)
@@ -243,13 +257,13 @@ class GradtagsberechnungGUI(QMainWindow):
         charts_group = QGroupBox("Temperaturverlauf")
         charts_layout = QVBoxLayout(charts_group)
         
-        # Scrollable area for charts
-        charts_scroll = QScrollArea()
-        charts_scroll.setWidgetResizable(True)
-        charts_container = QWidget()
-        self.charts_container_layout = QVBoxLayout(charts_container)
-        charts_scroll.setWidget(charts_container)
-        charts_layout.addWidget(charts_scroll)
+        # Shared chart view with city selector, created with the first result
+        self.charts_layout = charts_layout
+        self.chart_placeholder = QLabel("Diagramme erscheinen nach der Berechnung")
+        self.chart_placeholder.setAlignment(Qt.AlignCenter)
+        self.chart_placeholder.setMinimumHeight(400)
+        charts_layout.addWidget(self.chart_placeholder)
+        self.results_list.itemClicked.connect(self.show_result_chart)
         
         # Add groups to main layout
         right_layout.addWidget(results_group)
@@ -257,35 +271,154 @@ class GradtagsberechnungGUI(QMainWindow):
         
         return right_widget
 
+    def get_geocoder(self):
+        if self.geocoder is None:
+            self.geocoder = create_geocoder()
+        return self.geocoder
+
+    def get_chart_view(self):
+        if self.chart_view is None:
+            # plotly und QtWebEngine erst beim ersten Diagramm laden
+            from Library.chartHandler import ChartView
+            self.chart_view = ChartView()
+            self.charts_layout.replaceWidget(self.chart_placeholder, self.chart_view)
+            self.chart_placeholder.deleteLater()
+        return self.chart_view
+
     def add_city(self):
-        dialog = CityDialog(self)
+        dialog = CityDialog(self, self.get_geocoder())
         if dialog.exec_() == QDialog.Accepted:
-            address_parts = dialog.selected_address.split(',')
-            city_name = address_parts[0].strip()
-            if len(city_name) > 30 and len(address_parts) > 1:
-                city_name = f"{address_parts[0].strip()}, {address_parts[1].strip()}"
-            item_text = f"{dialog.selected_address} ({dialog.selected_lat:.4f}, {dialog.selected_lon:.4f})"
-            item = QListWidgetItem(item_text)
-            item.setToolTip(dialog.selected_address)
-            item.setData(Qt.UserRole, {
-                'name': city_name,
-                'lat': dialog.selected_lat,
-                'lon': dialog.selected_lon,
-                'full_address': dialog.selected_address
-            })
-            self.city_list.addItem(item)
+            self.add_city_item(
+                self.city_name_from_address(dialog.selected_address),
+                dialog.selected_lat,
+                dialog.selected_lon,
+                dialog.selected_address
+            )
             QMessageBox.information(self, "Erfolg", f"Adresse '{dialog.selected_address}' wurde hinzugefügt!")
 
+    def city_name_from_address(self, address):
+        address_parts = address.split(',')
+        city_name = address_parts[0].strip()
+        if len(city_name) > 30 and len(address_parts) > 1:
+            city_name = f"{address_parts[0].strip()}, {address_parts[1].strip()}"
+        return city_name
+
+    def unique_city_name(self, city_name):
+        # Ergebnisse, Diagramme und Exporte sind nach Namen geordnet; gleiche Namen
+        # (z.B. nur die Hausnummer aus der Adresse) würden sich gegenseitig überschreiben
+        names = {self.city_list.item(i).data(Qt.UserRole)['name'] for i in range(self.city_list.count())}
+        unique_name = city_name
+        suffix = 2
+        while unique_name in names:
+            unique_name = f"{city_name} ({suffix})"
+            suffix += 1
+        return unique_name
+
+    def add_city_item(self, city_name, lat, lon, full_address):
+        item_text = f"{full_address} ({lat:.4f}, {lon:.4f})"
+        item = QListWidgetItem(item_text)
+        item.setToolTip(full_address)
+        item.setData(Qt.UserRole, {
+            'name': self.unique_city_name(city_name),
+            'base_name': city_name,
+            'lat': lat,
+            'lon': lon,
+            'full_address': full_address
+        })
+        self.city_list.addItem(item)
+
+    def import_addresses(self):
+        if self.import_worker is not None:
+            # Laufender Import: Button dient zum Abbrechen
+            self.import_worker.cancel()
+            self.import_btn.setEnabled(False)
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Adressen importieren", "", "Adresslisten (*.csv *.txt *.xlsx);;Alle Dateien (*)")
+        if not path:
+            return
+        from Library.geocodeHandler import read_address_file
+        try:
+            self.import_entries = read_address_file(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Fehler", f"Datei konnte nicht gelesen werden: {e}")
+            return
+        if not self.import_entries:
+            QMessageBox.warning(self, "Warnung", "Die Datei enthält keine Adressen.")
+            return
+        # Geokodierung im Hintergrund, bereits bekannte Adressen kommen aus dem Cache
+        self.import_worker = ProgressWorker(
+            self.get_geocoder().geocode_many, [entry['address'] for entry in self.import_entries])
+        self.import_worker.signals.result.connect(self.on_import_result)
+        self.import_worker.signals.progress.connect(self.on_import_progress)
+        self.import_worker.signals.error.connect(self.on_import_error)
+        self.import_worker.signals.finished.connect(self.on_import_finished)
+        self.import_btn.setText("Import abbrechen")
+        self.import_progress.setValue(0)
+        self.import_progress.setVisible(True)
+        QThreadPool.globalInstance().start(self.import_worker)
+
+    def on_import_progress(self, finished, total):
+        self.import_progress.setMaximum(total)
+        self.import_progress.setValue(finished)
+
+    def on_import_result(self, results):
+        # Bereits vorhandene Einträge überspringen, damit ein abgebrochener Import fortgesetzt werden kann
+        existing = set()
+        for i in range(self.city_list.count()):
+            city_data = self.city_list.item(i).data(Qt.UserRole)
+            existing.add((city_data['base_name'], city_data['full_address']))
+        added = 0
+        not_found = []
+        for entry in self.import_entries:
+            if entry['address'] not in results:
+                continue
+            result = results[entry['address']]
+            if not result:
+                not_found.append(entry['address'])
+                continue
+            city_name = entry['name'] or self.city_name_from_address(result['display_name'])
+            if (city_name, result['display_name']) in existing:
+                continue
+            existing.add((city_name, result['display_name']))
+            self.add_city_item(city_name, result['lat'], result['lon'], result['display_name'])
+            added += 1
+        message = f"{added} Adressen importiert."
+        if not_found:
+            message += f"\n{len(not_found)} Adressen nicht gefunden, z.B.:\n" + "\n".join(not_found[:5])
+        if self.import_worker is not None and self.import_worker.cancel_event.is_set():
+            message += "\n\nImport abgebrochen. Erneut importieren setzt den Import fort."
+        QMessageBox.information(self, "Import", message)
+
+    def on_import_error(self, error):
+        QMessageBox.critical(self, "Fehler", f"Import fehlgeschlagen: {error}")
+
+    def on_import_finished(self):
+        self.import_worker = None
+        self.import_btn.setText("Adressen importieren (CSV/Excel)")
+        self.import_btn.setEnabled(True)
+        self.import_progress.setVisible(False)
+
     def remove_city(self):
         current_row = self.city_list.currentRow()
         if current_row >= 0:
             self.city_list.takeItem(current_row)
 
     def start_calculation(self):
+        from Library.gradtagszahlenCalculator import GradtagszahlenCalculator, CityData
+        from Library.crudHandler import CrudHandler
+        from Library.cacheHandler import TemperatureCache, DEFAULT_CACHE_DIR
         start_date = self.start_date.date().toString("yyyy-MM-dd")
         end_date = self.end_date.date().toString("yyyy-MM-dd")
         room_temp = self.room_temp.value()
         heating_limit = self.heating_limit.value()
+        metrics = ['gradtagszahl']
+        if self.hgt_check.isChecked():
+            metrics.append('heating_degree_days')
+        if self.cdd_check.isChecked():
+            metrics.append('cooling_degree_days')
+        if self.monthly_check.isChecked():
+            metrics.append('monthly')
         cities = []
         for i in range(self.city_list.count()):
             item = self.city_list.item(i)
@@ -299,169 +432,204 @@ class GradtagsberechnungGUI(QMainWindow):
             QMessageBox.warning(self, "Warnung", "Bitte mindestens eine Adresse auswählen!")
             return
         self.results_list.clear()
-        for i in reversed(range(self.charts_container_layout.count())):
-            widget = self.charts_container_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-        # Initialisiere API-Handler und Calculator
-        crud_handler = CrudHandler("https://archive-api.open-meteo.com/v1")
-        calculator = GradtagszahlenCalculator(crud_handler)
-        try:
-            results = calculator.calculate_for_cities(
-                cities=cities,
-                start_date=start_date,
-                end_date=end_date,
-                room_temperature=room_temp,
-                heating_limit=heating_limit
-            )
-        except Exception as e:
-            QMessageBox.critical(self, "Fehler", f"Berechnung fehlgeschlagen: {e}")
-            return
-        # Für jede Stadt: Temperaturdaten abfragen und Diagramm erzeugen
-        for city in cities:
-            city_name = city.name
-            result = results.get(city_name)
-            if not result:
-                continue
-            # Temperaturdaten für Plot abfragen
-            try:
-                temps = calculator.get_temperature_data(city, start_date, end_date)
-            except Exception as e:
-                QMessageBox.warning(self, "Warnung", f"Temperaturdaten für {city_name} konnten nicht geladen werden: {e}")
-                continue
-            # Heiztage und Differenzen berechnen
-            daily_hdds = []
-            for temp in temps:
-                if temp < heating_limit:
-                    hdd = room_temp - temp
-                    daily_hdds.append(hdd)
-                else:
-                    daily_hdds.append(0)
-            # Ergebnistext
-            result_text = (f"{city_name}: \n"
-                         f"Gradtagszahl: {result.gradtagszahl:.1f}\n"
-                         f"Durchschnittstemperatur: {sum(temps)/len(temps):.1f}°C\n"
-                         f"Heiztage: {result.heating_days_count}")
-            item = QListWidgetItem(result_text)
-            # Abwechselnd einfärben
-            if self.results_list.count() % 2 == 1:
-                item.setBackground(Qt.lightGray)
-            self.results_list.addItem(item)
-            # Datumsliste erzeugen
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            dates = [(start + timedelta(days=x)).strftime("%Y-%m-%d") for x in range(len(temps))]
-            self.create_temperature_chart(
-                city_name,
-                dates,
-                temps,
-                room_temp,
-                heating_limit,
-                daily_hdds
-            )
-        self.export_btn.setEnabled(True)
-
-    def create_temperature_chart(self, city_name, dates, temperatures, room_temp, heating_limit, hdds):
-        chart_container = QWidget()
-        chart_layout = QVBoxLayout(chart_container)
-        chart_layout.setContentsMargins(0, 0, 0, 0)
-        chart_layout.setSpacing(0)
-        web_view = QWebEngineView()
-        web_view.setMinimumHeight(400)
-        web_view.setMaximumHeight(400)
-        fig = go.Figure()
-        # Temperaturkurve als Treppenfunktion (hv), keine Marker
-        fig.add_trace(go.Scatter(
-            x=dates,
-            y=temperatures,
-            name='Außentemperatur',
-            line=dict(color='#2196F3', shape='hv'),
-            hovertemplate='%{y:.1f}°C<extra></extra>',
-            mode='lines'
-        ))
-        # Raumtemperatur-Linie
-        fig.add_trace(go.Scatter(
-            x=dates,
-            y=[room_temp]*len(dates),
-            name='Raumtemperatur',
-            line=dict(color='#FF9800', dash='dash')
-        ))
-        # Heizgrenze-Linie
-        fig.add_trace(go.Scatter(
-            x=dates,
-            y=[heating_limit]*len(dates),
-            name='Heizgrenze',
-            line=dict(color='#F44336', dash='dash')
-        ))
-        # Heizbedarf-Flächen: Für jeden Block von Heiztagen eine eigene Fläche
-        block_start = None
-        for i, temp in enumerate(temperatures + [None]):  # +[None] für Blockende am Schluss
-            if temp is not None and temp < heating_limit:
-                if block_start is None:
-                    block_start = i
-            else:
-                if block_start is not None:
-                    block_end = i
-                    # Block von block_start bis block_end-1
-                    x_block = dates[block_start:block_end] + dates[block_start:block_end][::-1]
-                    y_block = [room_temp]*(block_end-block_start) + temperatures[block_start:block_end][::-1]
-                    fig.add_trace(go.Scatter(
-                        x=x_block,
-                        y=y_block,
-                        fill='toself',
-                        fillcolor='rgba(255, 152, 0, 0.2)',
-                        line=dict(width=0),
-                        name='Heizbedarf' if block_start == 0 else None,
-                        showlegend=(block_start == 0),
-                        hoverinfo='skip',
-                    ))
-                    block_start = None
-        fig.update_layout(
-            title=f'Temperaturverlauf - {city_name}',
-            xaxis_title='Datum',
-            yaxis_title='Temperatur (°C)',
-            hovermode='x unified',
-            height=400,
-            margin=dict(l=50, r=50, t=50, b=50),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01,
-                bgcolor='rgba(255, 255, 255, 0.8)'
-            )
+        if self.chart_view is not None:
+            self.chart_view.clear()
+        self.results = {}
+        self.export_btn.setEnabled(False)
+        if self.temperature_cache is None:
+            self.temperature_cache = TemperatureCache(DEFAULT_CACHE_DIR)
+        # Zeitmessung je Berechnung
+        tracer.clear()
+        self.trace_btn.setEnabled(False)
+        # API-Handler einmal je Fenster, damit Verbindungen wiederverwendet und beim Schließen freigegeben werden
+        if self.crud_handler is None:
+            self.crud_handler = CrudHandler("https://archive-api.open-meteo.com/v1", requests_per_second=5)
+        calculator = GradtagszahlenCalculator(self.crud_handler, self.temperature_cache)
+        # Berechnung im Hintergrund, Ergebnisse werden pro Adresse angezeigt, sobald sie vorliegen
+        self.calculation_worker = CalculationWorker(
+            calculator,
+            cities,
+            start_date=start_date,
+            end_date=end_date,
+            room_temperature=room_temp,
+            heating_limit=heating_limit,
+            metrics=metrics,
+            max_workers=8,
+            batch_size=20
+        )
+        self.calculation_worker.signals.result.connect(self.on_calculation_result)
+        self.calculation_worker.signals.progress.connect(self.on_calculation_progress)
+        self.calculation_worker.signals.error.connect(self.on_calculation_error)
+        self.calculation_worker.signals.finished.connect(self.on_calculation_finished)
+        self.calculate_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.progress_bar.setMaximum(len(cities))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        QThreadPool.globalInstance().start(self.calculation_worker)
+
+    def on_calculation_result(self, result):
+        self.results[result.city_name] = result
+        # Ergebnistext
+        result_text = (f"{result.city_name}: \n"
+                     f"Gradtagszahl: {result.gradtagszahl:.1f}\n"
+                     f"Durchschnittstemperatur: {result.mean_temperature:.1f}°C\n"
+                     f"Heiztage: {result.heating_days_count}")
+        if result.heating_degree_days is not None:
+            result_text += f"\nHeizgradtage: {result.heating_degree_days:.1f}"
+        if result.cooling_degree_days is not None:
+            result_text += (f"\nKühlgradtage: {result.cooling_degree_days:.1f} "
+                            f"({result.cooling_days_count} Tage)")
+        if result.monthly:
+            result_text += "\nMonatswerte: " + ", ".join(
+                f"{month.month[5:]}/{month.month[2:4]}: {month.gradtagszahl:.0f}" for month in result.monthly)
+        item = QListWidgetItem(result_text)
+        item.setData(Qt.UserRole, result.city_name)
+        # Abwechselnd einfärben
+        if self.results_list.count() % 2 == 1:
+            item.setBackground(Qt.lightGray)
+        self.results_list.addItem(item)
+        # Diagramm aus den bereits geladenen Tagesdaten, erstellt erst bei der Auswahl
+        self.create_temperature_chart(
+            result.city_name,
+            result.series,
+            result.room_temperature,
+            result.heating_limit
         )
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
-        temp_file.write(fig.to_html(include_plotlyjs='cdn', full_html=True))
-        temp_file.close()
-        web_view.load(QUrl.fromLocalFile(temp_file.name))
-        chart_layout.addWidget(web_view)
-        chart_container.setMinimumHeight(400)
-        chart_container.setMaximumHeight(400)
-        self.charts_container_layout.addWidget(chart_container)
+
+    def on_calculation_progress(self, finished, total):
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(finished)
+
+    def on_calculation_error(self, error):
+        QMessageBox.critical(self, "Fehler", f"Berechnung fehlgeschlagen: {error}")
+
+    def on_calculation_finished(self):
+        location_index = None
+        if self.calculation_worker is not None:
+            location_index = self.calculation_worker.calculator.location_index
+        self.calculation_worker = None
+        self.calculate_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.setText("Abbrechen")
+        self.progress_bar.setVisible(False)
+        self.export_btn.setEnabled(bool(self.results))
+        self.trace_btn.setEnabled(True)
+        # Wo ging die Zeit hin: Netzwerk, Parsen oder Diagramme
+        status = tracer.summary_text()
+        if location_index is not None:
+            status = (f"{len(location_index.cities)} Adressen in {len(location_index)} Rasterzellen, "
+                      f"{location_index.saved_requests} Anfragen gespart | {status}")
+        self.statusBar().showMessage(status)
+
+    def cancel_calculation(self):
+        if self.calculation_worker is not None:
+            self.calculation_worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.cancel_btn.setText("Wird abgebrochen...")
+
+    def closeEvent(self, event):
+        self.cancel_calculation()
+        if self.import_worker is not None:
+            self.import_worker.cancel()
+        if self.crud_handler is not None:
+            self.crud_handler.close()
+            self.crud_handler = None
+        super().closeEvent(event)
+
+    def show_result_chart(self, item):
+        if self.chart_view is not None:
+            self.chart_view.show_chart(item.data(Qt.UserRole))
+
+    def create_temperature_chart(self, city_name, series, room_temp, heating_limit):
+        self.get_chart_view().add_chart(
+            city_name, partial(self.build_chart_json, city_name, series, room_temp, heating_limit))
+
+    def build_chart_json(self, city_name, series, room_temp, heating_limit):
+        from Library.chartHandler import build_temperature_figure
+        with tracer.span('chart_build', city=city_name):
+            return build_temperature_figure(city_name, series, room_temp, heating_limit).to_json()
 
     def export_results(self):
-        QMessageBox.information(self, "Info", "Export-Funktionalität würde hier implementiert")
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Ergebnisse exportieren", "gradtagszahlen.csv",
+            "CSV (*.csv);;Excel (*.xlsx);;Parquet (*.parquet)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += selected_filter[selected_filter.index('*') + 1:-1]
+        from Library.exportHandler import export_results
+        # Schreiben im Hintergrund, Tageswerte vieler Adressen können groß werden
+        self.export_btn.setEnabled(False)
+        worker = Worker(export_results, path, list(self.results.values()))
+        worker.signals.result.connect(self.on_export_result)
+        worker.signals.error.connect(self.on_export_error)
+        worker.signals.finished.connect(self.on_export_finished)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_export_result(self, count):
+        self.statusBar().showMessage(f"{count} Ergebnisse exportiert", 5000)
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Zeitprofil exportieren", "zeitprofil.json", "JSON-Trace (*.json)")
+        if not path:
+            return
+        try:
+            tracer.export_json(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Fehler", f"Zeitprofil konnte nicht gespeichert werden: {e}")
+            return
+        self.statusBar().showMessage(f"Zeitprofil gespeichert: {path}", 5000)
+
+    def on_export_error(self, error):
+        QMessageBox.critical(self, "Fehler", f"Export fehlgeschlagen: {error}")
+
+    def on_export_finished(self):
+        self.export_btn.setEnabled(bool(self.results))
 
     def reset_form(self):
+        if self.calculation_worker is not None:
+            # Noch laufende Adressen nicht mehr anzeigen
+            self.calculation_worker.signals.result.disconnect(self.on_calculation_result)
+            self.cancel_calculation()
         self.start_date.setDate(QDate(2023, 10, 1))
         self.end_date.setDate(QDate(2024, 4, 30))
         self.room_temp.setValue(20.0)
         self.heating_limit.setValue(15.0)
         self.export_btn.setEnabled(False)
+        self.trace_btn.setEnabled(False)
         self.results_list.clear()
+        self.results = {}
         
         # Clear all charts
-        for i in reversed(range(self.charts_container_layout.count())):
-            widget = self.charts_container_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
+        if self.chart_view is not None:
+            self.chart_view.clear()
+
+def report_startup_time(window_time):
+    # Aufruf über QTimer, nachdem die Ereignisschleife das Fenster erstmals gezeichnet hat
+    paint_time = time.perf_counter()
+    print(f"Importe: {(IMPORT_TIME - STARTUP_TIME) * 1000:.0f} ms", file=sys.stderr)
+    print(f"Fenster erstellt: {(window_time - STARTUP_TIME) * 1000:.0f} ms", file=sys.stderr)
+    print(f"Erste Darstellung: {(paint_time - STARTUP_TIME) * 1000:.0f} ms", file=sys.stderr)
+    loaded = [name for name in ('numpy', 'requests', 'plotly', 'pandas', 'PyQt5.QtWebEngineWidgets')
+              if name in sys.modules]
+    print(f"Geladene schwere Module: {', '.join(loaded) or 'keine'}", file=sys.stderr)
+
 
 def main():
+    # Startzeiten messen: python main.py --startup-timing (--quit beendet nach der ersten Darstellung)
+    startup_timing = '--startup-timing' in sys.argv
+    # Erlaubt den späteren Import von QtWebEngineWidgets nach dem Erstellen der QApplication
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     window = GradtagsberechnungGUI()
     window.show()
+    if startup_timing:
+        window_time = time.perf_counter()
+        QTimer.singleShot(0, lambda: report_startup_time(window_time))
+        if '--quit' in sys.argv:
+            QTimer.singleShot(0, app.quit)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+import pytest
+
+from benchmarks.mockServer import MockOpenMeteoServer
+from Library.cacheHandler import TemperatureCache
+from Library.crudHandler import CrudHandler
+from Library.gradtagszahlenCalculator import CityData, GradtagszahlenCalculator
+from Library.seriesStore import SeriesStore
+
+START_DATE = '2020-01-01'
+END_DATE = '2020-12-31'
+
+# 0.005° apart: one cell of a 0.01° key, but the archive downscales each point on its own
+SITE_A = CityData('A', 52.5200, 13.4100)
+SITE_B = CityData('B', 52.5250, 13.4150)
+
+
+@pytest.fixture
+def crud_handler():
+    with MockOpenMeteoServer() as mock, CrudHandler(mock.base_url) as handler:
+        handler.mock = mock
+        yield handler
+
+
+def gradtagszahlen(crud_handler, cache, cities):
+    calculator = GradtagszahlenCalculator(crud_handler, cache)
+    results = calculator.calculate_for_cities(cities, START_DATE, END_DATE, 20.0, 15.0)
+    return {name: result.gradtagszahl for name, result in results.items()}
+
+
+@pytest.mark.parametrize('cache_class', [TemperatureCache, SeriesStore])
+def test_nearby_sites_keep_their_own_series_on_a_warm_cache(crud_handler, tmp_path, cache_class):
+    uncached = gradtagszahlen(crud_handler, None, [SITE_A, SITE_B])
+    assert uncached['A'] != uncached['B']
+
+    cache = cache_class(str(tmp_path))
+    assert gradtagszahlen(crud_handler, cache, [SITE_A]) == {'A': uncached['A']}
+    # B must be fetched, not served from the series cached for A
+    assert gradtagszahlen(crud_handler, cache, [SITE_B]) == {'B': uncached['B']}
+
+    crud_handler.mock.reset_counts()
+    assert gradtagszahlen(crud_handler, cache, [SITE_A, SITE_B]) == uncached
+    assert crud_handler.mock.request_count == 0